@@ -0,0 +1,295 @@
+"""
+bulk_io.py
+----------
+Input streaming, incremental result writing and checkpointing for
+offline bulk analysis (see `run_analysis.main`).
+
+Deliberately free of model/torch imports so lightweight tools (e.g. a
+coordinator that only talks HTTP) can reuse it.
+
+Supported Inputs:
+- ``.jsonl`` files: one JSON object per line (text and optional id field)
+- ``.txt`` files: the whole file is one document
+- ``.pdf`` files: text extracted page by page
+- Directories: all ``.txt`` / ``.pdf`` files below them, in sorted order
+
+Supported Outputs:
+- ``.jsonl``: one result per line, appended as documents finish
+- ``.parquet``: a directory of ``part-NNNNN.parquet`` files (requires pyarrow)
+
+Unreadable Documents:
+    A malformed JSONL line or a file that cannot be read or parsed does
+    not stop the run. It is yielded as ``{"id": ..., "error": ...}``
+    instead of a text, and written and checkpointed like any result, so
+    a resumed run moves past it.
+
+Resuming:
+    Results are written strictly in input order. After every written
+    batch a small ``<output>.checkpoint.json`` records how many documents
+    are done and how far the output is valid, so a crashed run restarts
+    exactly where it left off (partial writes after the last checkpoint
+    are discarded).
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+import io
+import json
+import os
+
+from PyPDF2 import PdfReader
+
+
+# ===============================
+#   INPUT STREAMING
+# ===============================
+
+def extract_pdf_text(data: bytes):
+    """
+    Extract plain text from PDF bytes (same approach as `/api/analyze-file`).
+    """
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _iter_directory(path: str):
+    """
+    All .txt / .pdf files below `path`, in a stable (sorted) order.
+    """
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith((".txt", ".pdf")):
+                yield os.path.join(root, name)
+
+
+def _read_file(path: str):
+    """
+    Read a single .txt or .pdf file as one document's text.
+    """
+    if path.lower().endswith(".pdf"):
+        with open(path, "rb") as f:
+            return extract_pdf_text(f.read())
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _fail(error: Exception):
+    """
+    A `read_text` callable that raises `error` (for unparseable entries).
+    """
+    def read_text():
+        raise error
+
+    return read_text
+
+
+def _iter_sources(paths: list, text_field: str, id_field: str, published_field: str = None):
+    """
+    Yield (id, read_text, extra) per document; `read_text()` loads the
+    text lazily and `extra` holds optional fields (e.g. ``published_at``).
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for file_path in _iter_directory(path):
+                yield file_path, (lambda p=file_path: _read_file(p)), {}
+
+        elif path.lower().endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+                    except ValueError as e:
+                        yield f"{path}:{line_number}", _fail(e), {}
+                        continue
+                    doc_id = str(record.get(id_field, f"{path}:{line_number}"))
+                    extra = {}
+                    if published_field and record.get(published_field) is not None:
+                        extra["published_at"] = record[published_field]
+                    yield doc_id, (lambda r=record: str(r.get(text_field, ""))), extra
+
+        elif path.lower().endswith((".txt", ".pdf")):
+            yield path, (lambda p=path: _read_file(p)), {}
+
+        else:
+            raise ValueError(f"Unsupported input: {path} (expected .jsonl, .txt, .pdf or a directory)")
+
+
+def iter_documents(paths: list, text_field: str = "text", id_field: str = "id", skip: int = 0,
+                   published_field: str = None):
+    """
+    Stream documents from files and directories without loading them all.
+
+    Args:
+        paths (list[str]): Input files (.jsonl, .txt, .pdf) or directories.
+        text_field (str): JSONL key holding the text.
+        id_field (str): JSONL key holding the document id. Documents
+            without one get ``<path>:<line number>``.
+        skip (int): Number of leading documents to skip (already done).
+            Skipped files are not read or PDF-parsed.
+        published_field (str, optional): JSONL key holding a publication
+            timestamp, passed through as ``published_at``.
+
+    Yields:
+        dict: ``{"id": str, "text": str}`` per document, in a stable order
+        (plus ``published_at`` if present), or ``{"id": str, "error": str}``
+        if the document could not be read.
+    """
+    sources = _iter_sources(paths, text_field, id_field, published_field)
+    for index, (doc_id, read_text, extra) in enumerate(sources):
+        if index < skip:
+            continue
+        try:
+            text = read_text()
+        except Exception as e:
+            print(f"Skipping unreadable document {doc_id}: {e}")
+            yield {"id": doc_id, "error": f"{type(e).__name__}: {e}"}
+            continue
+        yield {"id": doc_id, "text": text, **extra}
+
+
+def iter_batches(documents, batch_size: int):
+    """
+    Group a document stream into lists of at most `batch_size`.
+    """
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ===============================
+#   CHECKPOINTED OUTPUT
+# ===============================
+
+class ResultWriter:
+    """
+    Append results in order and checkpoint progress after every batch.
+
+    Args:
+        output (str): ``.jsonl`` file or ``.parquet`` directory.
+        run_config (dict): Settings of this run (inputs, models, ...).
+            A checkpoint made with different settings is not resumed.
+        restart (bool): Ignore any existing checkpoint and start over,
+            discarding existing output.
+
+    Raises:
+        ValueError: If the checkpoint was made with other settings, or
+            the output already has content but no checkpoint (so it is
+            not silently overwritten), unless `restart` is set.
+    """
+
+    def __init__(self, output: str, run_config: dict, restart: bool = False):
+        self.output = output
+        self.format = "parquet" if output.lower().endswith(".parquet") else "jsonl"
+        self.checkpoint_path = output.rstrip(os.sep) + ".checkpoint.json"
+        self.run_config = run_config
+
+        self.state = {"config": run_config, "documents_done": 0, "output_bytes": 0, "parts": 0}
+        resuming = not restart and os.path.exists(self.checkpoint_path)
+        if not restart and not resuming and self._has_output():
+            raise ValueError(
+                f"Output {output} already exists and has no checkpoint; "
+                "use --restart to overwrite it."
+            )
+        if resuming:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous.get("config") != run_config:
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint_path} was made with different settings; "
+                    "use --restart to start over."
+                )
+            self.state = previous
+
+        if self.format == "parquet":
+            os.makedirs(output, exist_ok=True)
+            # Drop part files written after the last checkpoint
+            for name in os.listdir(output):
+                if name.startswith("part-") and name.split(".")[0][5:].isdigit():
+                    if int(name.split(".")[0][5:]) >= self.state["parts"]:
+                        os.remove(os.path.join(output, name))
+        else:
+            # Drop anything written after the last checkpoint
+            with open(output, "a+b") as f:
+                f.truncate(self.state["output_bytes"])
+
+    def _has_output(self):
+        """
+        Whether the output already holds results (a non-empty file or part files).
+        """
+        if self.format == "parquet":
+            return os.path.isdir(self.output) and any(
+                name.startswith("part-") for name in os.listdir(self.output)
+            )
+        return os.path.isfile(self.output) and os.path.getsize(self.output) > 0
+
+    @property
+    def documents_done(self):
+        """
+        Number of input documents already written (to skip on resume).
+        """
+        return self.state["documents_done"]
+
+    def write_batch(self, records: list):
+        """
+        Durably write one batch of results, then advance the checkpoint.
+        """
+        if self.format == "parquet":
+            self._write_parquet_part(records)
+        else:
+            with open(self.output, "ab") as f:
+                for record in records:
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                self.state["output_bytes"] = f.tell()
+
+        self.state["documents_done"] += len(records)
+        self._save_checkpoint()
+
+    def _write_parquet_part(self, records: list):
+        """
+        Write records as the next numbered part file (atomically).
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow).")
+
+        # Nested model outputs are stored as JSON strings for a stable schema
+        rows = [
+            {
+                key: value if isinstance(value, str) or value is None else json.dumps(value)
+                for key, value in record.items()
+            }
+            for record in records
+        ]
+
+        part_path = os.path.join(self.output, f"part-{self.state['parts']:05d}.parquet")
+        tmp_path = part_path + ".tmp"
+        pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+        os.replace(tmp_path, part_path)
+        self.state["parts"] += 1
+
+    def _save_checkpoint(self):
+        """
+        Atomically replace the checkpoint file.
+        """
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,416 @@
+"""
+coordinator.py
+--------------
+Distributed batch scoring across several Bias Checker backend nodes.
+
+Shards a corpus into fixed-size batches and sends each shard to one of a
+list of backend instances (each running the normal FastAPI app) through
+``POST /api/analyze-batch``. The coordinator:
+
+- Keeps every node busy with one shard at a time
+- Tracks the status of every shard (queued, running on node X, done)
+- Retries a failed shard on a different node, and stops using a node
+  after repeated consecutive failures
+- Merges results back in input order and writes them with the same
+  checkpointed writer as the bulk CLI, so an interrupted run resumes
+- Optionally saves the merged results in one result store
+  (`result_store.py`), so a single database covers the whole corpus
+
+No models are loaded here; only the standard library, `bulk_io` and
+`result_store` are used.
+
+Intended Usage (local test with three nodes)::
+
+    $ uvicorn main:app --port 8001 &
+    $ uvicorn main:app --port 8002 &
+    $ uvicorn main:app --port 8003 &
+    $ python coordinator.py articles.jsonl -o results.jsonl \\
+          --nodes http://localhost:8001 http://localhost:8002 http://localhost:8003
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from collections import deque
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+from bulk_io import ResultWriter, iter_batches, iter_documents
+from result_store import RESULT_DB_ENV, ResultStore
+
+
+class Shard:
+    """
+    A contiguous slice of the input documents and its scheduling state.
+    """
+
+    def __init__(self, index: int, documents: list):
+        self.index = index
+        self.documents = documents
+        self.attempts = 0
+        self.failed_nodes = set()
+        self.status = "queued"
+        self.model_version = None
+
+
+class Coordinator:
+    """
+    Distribute shards over backend nodes and merge results in order.
+
+    Args:
+        nodes (list[str]): Base URLs of backend instances.
+        selected (dict): Which analyses to run (as in `/api/analyze-batch`).
+        batch_size (int): Documents per forward pass on each node.
+        max_attempts (int): Attempts per shard before the run is aborted.
+        node_failure_limit (int): Consecutive failures after which a node
+            is no longer used.
+        timeout (float): HTTP timeout per shard request, in seconds.
+        api_key (str, optional): Sent as ``X-API-Key`` to every node.
+        store (ResultStore, optional): If set, merged results are also
+            saved here (once each, however often a shard was retried).
+        store_source (str, optional): Source name for stored results.
+    """
+
+    def __init__(self, nodes: list, selected: dict, batch_size: int = 16, max_attempts: int = 3,
+                 node_failure_limit: int = 3, timeout: float = 600.0, api_key: str = None,
+                 store: ResultStore = None, store_source: str = None):
+        self.nodes = [node.rstrip("/") for node in nodes]
+        self.selected = selected
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.node_failure_limit = node_failure_limit
+        self.timeout = timeout
+        self.api_key = api_key
+        self.store = store
+        self.store_source = store_source
+
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._results = {}
+        self._shards = {}
+        self._alive = set(self.nodes)
+        self._in_flight = 0
+        self._produced_all = False
+        self._error = None
+
+    # ------------------
+    #   Node requests
+    # ------------------
+
+    def _post_shard(self, node: str, shard: Shard):
+        """
+        Send one shard to a node and return its records (with ids).
+
+        Unreadable documents are not sent; their error records are
+        merged back in place.
+        """
+        readable = [doc for doc in shard.documents if "error" not in doc]
+        if not readable:
+            return list(shard.documents)
+
+        payload = {
+            "entries": [doc["text"] for doc in readable],
+            "selected": self.selected,
+            "batch_size": self.batch_size,
+            "priority": "bulk",
+        }
+        body = json.dumps(payload).encode("utf-8")
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+
+        request = urllib.request.Request(f"{node}/api/analyze-batch", data=body, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.loads(response.read())
+        results = reply["results"]
+        shard.model_version = reply.get("model_version") or "unknown"
+
+        if len(results) != len(readable):
+            raise ValueError(f"expected {len(readable)} results, got {len(results)}")
+
+        results = iter(results)
+        return [doc if "error" in doc else {"id": doc["id"], **next(results)} for doc in shard.documents]
+
+    def _take_shard(self, node: str):
+        """
+        Next shard for `node`, preferring shards that have not failed there.
+
+        A shard that already failed on this node is only taken if no other
+        live node could still try it. Must be called with the condition held.
+        """
+        for shard in self._pending:
+            if node not in shard.failed_nodes:
+                self._pending.remove(shard)
+                return shard
+
+        for shard in self._pending:
+            if not (self._alive - shard.failed_nodes):
+                self._pending.remove(shard)
+                return shard
+
+        return None
+
+    def _node_loop(self, node: str):
+        """
+        Worker thread: process shards on one node until the run ends.
+        """
+        consecutive_failures = 0
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._error or node not in self._alive:
+                        return
+                    shard = self._take_shard(node)
+                    if shard is not None:
+                        break
+                    if self._produced_all and not self._pending and not self._in_flight:
+                        return
+                    self._condition.wait()
+
+                self._in_flight += 1
+                shard.status = f"running on {node}"
+
+            try:
+                records = self._post_shard(node, shard)
+            except Exception as e:
+                consecutive_failures += 1
+                with self._condition:
+                    self._in_flight -= 1
+                    shard.attempts += 1
+                    shard.failed_nodes.add(node)
+                    print(f"  shard {shard.index} failed on {node} "
+                          f"(attempt {shard.attempts}/{self.max_attempts}): {e}")
+
+                    if consecutive_failures >= self.node_failure_limit:
+                        print(f"  node {node} disabled after {consecutive_failures} consecutive failures")
+                        self._alive.discard(node)
+
+                    if shard.attempts >= self.max_attempts:
+                        self._error = f"shard {shard.index} failed {shard.attempts} times"
+                    elif not self._alive:
+                        self._error = "no healthy nodes left"
+                    else:
+                        shard.status = "queued (retry)"
+                        self._pending.appendleft(shard)
+
+                    self._condition.notify_all()
+            else:
+                consecutive_failures = 0
+                with self._condition:
+                    self._in_flight -= 1
+                    shard.status = "done"
+                    self._results[shard.index] = records
+                    self._condition.notify_all()
+
+    def _store_shard(self, shard: Shard, records: list):
+        """
+        Save a finished shard's results in the result store.
+
+        Unreadable documents are skipped, as are documents whose
+        ``published_at`` is not a valid timestamp (with a warning).
+        """
+        for doc, record in zip(shard.documents, records):
+            if "error" in doc:
+                continue
+            results = {key: value for key, value in record.items() if key != "id"}
+            try:
+                self.store.save(
+                    doc["text"], results, shard.model_version, self.store_source,
+                    {"id": doc["id"]}, doc.get("published_at"),
+                )
+            except ValueError as e:
+                print(f"  not storing {doc['id']}: {e}")
+
+    # ------------------
+    #   Run
+    # ------------------
+
+    def progress(self):
+        """
+        Count of shards per status (e.g. queued / running on X / done).
+        """
+        with self._condition:
+            counts = {}
+            for shard in self._shards.values():
+                counts[shard.status] = counts.get(shard.status, 0) + 1
+            return counts
+
+    def run(self, documents, writer: ResultWriter, shard_size: int):
+        """
+        Score all documents and write merged results in input order.
+
+        At most two shards per node are held in memory (queued, running
+        or finished but waiting for earlier shards), so arbitrarily large
+        inputs can be streamed.
+
+        Args:
+            documents (iterable[dict]): Documents from `bulk_io.iter_documents`.
+            writer (ResultWriter): Checkpointed output.
+            shard_size (int): Documents per shard.
+
+        Raises:
+            RuntimeError: If a shard exhausted its attempts or all nodes failed.
+        """
+        threads = [
+            threading.Thread(target=self._node_loop, args=(node,), daemon=True)
+            for node in self.nodes
+        ]
+        for thread in threads:
+            thread.start()
+
+        max_unwritten = 2 * len(self.nodes)
+        next_index = 0
+        start = time.perf_counter()
+        last_report = start
+
+        def take_ready():
+            # Pop finished shards that continue the in-order prefix (condition held)
+            nonlocal next_index
+            ready = []
+            while next_index in self._results:
+                ready.append((self._shards.pop(next_index), self._results.pop(next_index)))
+                next_index += 1
+            return ready
+
+        def write(ready):
+            # Output and store I/O run without the condition held, so node
+            # threads can keep reporting results and taking shards meanwhile
+            nonlocal last_report
+            for shard, records in ready:
+                # Stored before the checkpoint advances; a resumed run's
+                # repeated saves are ignored by the store
+                if self.store is not None:
+                    self._store_shard(shard, records)
+                writer.write_batch(records)
+
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                last_report = now
+                print(f"  {writer.documents_done} documents written; shards in progress: {self.progress()}")
+
+        def wait_and_write(done):
+            # Write whatever is ready; block (briefly) only while `done()` is false
+            with self._condition:
+                ready = take_ready()
+                if not ready and not done():
+                    self._condition.wait(timeout=1)
+                    ready = take_ready()
+                finished = not ready and done()
+            write(ready)
+            return finished
+
+        for index, batch in enumerate(iter_batches(documents, shard_size)):
+            shard = Shard(index, batch)
+            while not wait_and_write(lambda: self._error or len(self._shards) < max_unwritten):
+                pass
+
+            with self._condition:
+                if self._error:
+                    break
+                self._shards[index] = shard
+                self._pending.append(shard)
+                self._condition.notify_all()
+
+        with self._condition:
+            self._produced_all = True
+            self._condition.notify_all()
+
+        while not wait_and_write(lambda: self._error or not self._shards):
+            pass
+
+        with self._condition:
+            self._condition.notify_all()
+
+        for thread in threads:
+            thread.join()
+
+        if self._error:
+            raise RuntimeError(f"Distributed run aborted: {self._error}")
+
+        elapsed = time.perf_counter() - start
+        print(f"  all shards done in {elapsed:.1f}s")
+
+
+# ==============================================
+#  MAIN EXECUTION LOGIC
+# ==============================================
+def main():
+    """
+    Command-line entry point for the distributed coordinator.
+    """
+    parser = argparse.ArgumentParser(description="Shard bulk analysis across backend nodes.")
+    parser.add_argument("inputs", nargs="+", help=".jsonl/.txt/.pdf files or directories.")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output .jsonl file or .parquet directory.")
+    parser.add_argument("--nodes", nargs="+", required=True,
+                        help="Backend base URLs, e.g. http://localhost:8001")
+    parser.add_argument("--models", nargs="+", default=["sentiment", "political", "toxicity"],
+                        choices=["sentiment", "political", "toxicity", "toxicity_spans"])
+    parser.add_argument("--summary", action="store_true", help="Also generate FLAN summaries.")
+    parser.add_argument("--shard-size", type=int, default=64, help="Documents per shard request.")
+    parser.add_argument("--batch-size", type=int, default=16, help="Documents per forward pass on a node.")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per shard before aborting.")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds per shard request.")
+    parser.add_argument("--api-key", help="Sent to the nodes as X-API-Key.")
+    parser.add_argument("--store-source",
+                        help="Also save merged results in the result store under this source.")
+    parser.add_argument("--store-db", default=os.environ.get(RESULT_DB_ENV, "results.db"),
+                        help="Result store database for --store-source.")
+    parser.add_argument("--published-field", default="published_at",
+                        help="JSONL key holding the publication time used to date stored results.")
+    parser.add_argument("--text-field", default="text", help="JSONL key holding the text.")
+    parser.add_argument("--id-field", default="id", help="JSONL key holding the document id.")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over.")
+    args = parser.parse_args()
+
+    selected = {model: True for model in args.models}
+    selected["summary"] = args.summary
+
+    run_config = {
+        "inputs": [os.path.abspath(path) for path in args.inputs],
+        "selected": selected,
+        "text_field": args.text_field,
+        "id_field": args.id_field,
+    }
+    try:
+        writer = ResultWriter(args.output, run_config, restart=args.restart)
+    except ValueError as e:
+        parser.error(str(e))
+    if writer.documents_done:
+        print(f"Resuming after {writer.documents_done} completed documents.")
+
+    documents = iter_documents(
+        args.inputs, args.text_field, args.id_field, skip=writer.documents_done,
+        published_field=args.published_field,
+    )
+
+    coordinator = Coordinator(
+        args.nodes, selected,
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts,
+        timeout=args.timeout,
+        api_key=args.api_key,
+        store=ResultStore(args.store_db) if args.store_source else None,
+        store_source=args.store_source,
+    )
+
+    print(f"\n ==== Distributing across {len(args.nodes)} nodes ==== \n")
+    try:
+        coordinator.run(documents, writer, args.shard_size)
+    except RuntimeError as e:
+        print(f"\n{e}. Re-run the same command to resume.")
+        return 1
+
+    print(f"\n ==== Finished: {writer.documents_done} documents written to {args.output} ==== \n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+fake_models.py
+--------------
+Lightweight stand-in model backend for serving-layer load tests.
+
+Replaces the real transformer pipelines and Detoxify model with fakes
+that return deterministic outputs in the real response shapes, after a
+configurable, randomly distributed latency, while holding a configurable
+amount of memory. This lets concurrency, batching and backpressure in
+`main.py` be exercised without downloading or loading several GB of models.
+
+Enable it by pointing ``BIAS_CHECKER_FAKE_MODELS`` at a JSON config file,
+or setting it to ``1`` for the defaults below; `run_analysis.load_models()`
+then installs the fakes instead of loading real models.
+
+Config Format::
+
+    {
+        "seed": 0,
+        "models": {
+            "emotion":   {"latency": {"distribution": "lognormal", "median_ms": 30, "sigma": 0.4},
+                          "per_item_ms": 5, "memory_mb": 420},
+            "political": {"latency": {"distribution": "normal", "mean_ms": 120, "stddev_ms": 20}},
+            "toxicity":  {"latency": {"distribution": "uniform", "low_ms": 20, "high_ms": 60}},
+            "flan":      {"latency": {"distribution": "constant", "ms": 900}}
+        }
+    }
+
+``per_item_ms`` is added for every extra input of a batched call. Models
+missing from the config use the defaults.
+
+Intended Usage:
+    $ BIAS_CHECKER_FAKE_MODELS=1 uvicorn main:app --port 8000
+    $ python load_test.py --rate 20 --duration 60
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+
+# Environment variable enabling the fake backend ("1" or a JSON config path)
+FAKE_MODELS_ENV = "BIAS_CHECKER_FAKE_MODELS"
+
+DEFAULT_CONFIG = {
+    "seed": 0,
+    "models": {
+        "emotion": {"latency": {"distribution": "lognormal", "median_ms": 30, "sigma": 0.4},
+                    "per_item_ms": 5, "memory_mb": 0},
+        "political": {"latency": {"distribution": "lognormal", "median_ms": 150, "sigma": 0.4},
+                      "per_item_ms": 40, "memory_mb": 0},
+        "toxicity": {"latency": {"distribution": "lognormal", "median_ms": 40, "sigma": 0.4},
+                     "per_item_ms": 8, "memory_mb": 0},
+        "flan": {"latency": {"distribution": "lognormal", "median_ms": 900, "sigma": 0.3},
+                 "per_item_ms": 900, "memory_mb": 0},
+    },
+}
+
+EMOTION_LABELS = ["sadness", "joy", "love", "anger", "fear", "surprise"]
+POLITICAL_LABELS = ["LABEL_0", "LABEL_1", "LABEL_2"]
+TOXICITY_LABELS = [
+    "toxicity", "severe_toxicity", "obscene", "identity_attack",
+    "insult", "threat", "sexual_explicit",
+]
+
+
+def load_fake_config():
+    """
+    Fake backend config from ``BIAS_CHECKER_FAKE_MODELS``.
+
+    Returns:
+        dict or None: Config merged over the defaults, or None if the
+        fake backend is not enabled.
+    """
+    value = os.environ.get(FAKE_MODELS_ENV)
+    if not value or value == "0":
+        return None
+
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    if value != "1":
+        with open(value, "r", encoding="utf-8") as f:
+            custom = json.load(f)
+        config["seed"] = custom.get("seed", config["seed"])
+        for name, settings in custom.get("models", {}).items():
+            config["models"].setdefault(name, {}).update(settings)
+
+    return config
+
+
+def _hash_unit(*parts):
+    """
+    Deterministic pseudo-random float in [0, 1) derived from `parts`.
+    """
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+class FakeModel:
+    """
+    Shared latency and memory behaviour of every fake model.
+
+    Args:
+        name (str): Model key (used for seeding and deterministic outputs).
+        settings (dict): Latency distribution, per-item cost and memory.
+        seed (int): Seed for the latency random number generator.
+    """
+
+    def __init__(self, name: str, settings: dict, seed: int = 0):
+        self.name = name
+        self.latency = settings.get("latency", {"distribution": "constant", "ms": 0})
+        self.per_item_ms = settings.get("per_item_ms", 0)
+
+        self._rng = random.Random(f"{seed}:{name}")
+        self._rng_lock = threading.Lock()
+
+        # Resident memory ballast: touch every page so it is really allocated
+        memory_mb = settings.get("memory_mb", 0)
+        self._ballast = bytearray(int(memory_mb * 1024 * 1024))
+        for offset in range(0, len(self._ballast), 4096):
+            self._ballast[offset] = 1
+
+        # Attributes some callers inspect on real pipelines
+        self.model = None
+        self.tokenizer = None
+
+    def _sample_ms(self):
+        """
+        Draw one latency in milliseconds from the configured distribution.
+        """
+        latency = self.latency
+        distribution = latency.get("distribution", "constant")
+
+        with self._rng_lock:
+            if distribution == "constant":
+                value = latency.get("ms", 0)
+            elif distribution == "uniform":
+                value = self._rng.uniform(latency["low_ms"], latency["high_ms"])
+            elif distribution == "normal":
+                value = self._rng.gauss(latency["mean_ms"], latency.get("stddev_ms", 0))
+            elif distribution == "lognormal":
+                value = self._rng.lognormvariate(math.log(latency["median_ms"]), latency.get("sigma", 0.5))
+            else:
+                raise ValueError(f"Unknown latency distribution: {distribution}")
+
+        return max(0.0, value)
+
+    def _simulate(self, items: int):
+        """
+        Sleep for one call covering `items` inputs.
+        """
+        ms = self._sample_ms() + self.per_item_ms * max(0, items - 1)
+        time.sleep(ms / 1000.0)
+
+    def _scores(self, text: str, labels: list):
+        """
+        Deterministic probability distribution over `labels` for `text`.
+        """
+        logits = [4.0 * _hash_unit(self.name, label, text) for label in labels]
+        total = sum(math.exp(logit) for logit in logits)
+        return [math.exp(logit) / total for logit in logits]
+
+
+class FakeTextClassifier(FakeModel):
+    """
+    Stand-in for a ``text-classification`` pipeline.
+    """
+
+    def __init__(self, name: str, settings: dict, labels: list, seed: int = 0):
+        super().__init__(name, settings, seed)
+        self.labels = labels
+
+    def _classify(self, text: str, all_scores: bool):
+        scores = [
+            {"label": label, "score": score}
+            for label, score in zip(self.labels, self._scores(text, self.labels))
+        ]
+        if all_scores:
+            return scores
+        return max(scores, key=lambda x: x["score"])
+
+    def __call__(self, inputs, return_all_scores: bool = False, top_k=1, **kwargs):
+        all_scores = return_all_scores or top_k is None
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+
+        self._simulate(len(texts))
+        outputs = [self._classify(text, all_scores) for text in texts]
+
+        if isinstance(inputs, str):
+            # Real pipelines wrap a single all-scores result in a list
+            return [outputs[0]] if all_scores else outputs
+        return outputs
+
+
+class FakeDetoxify(FakeModel):
+    """
+    Stand-in for `detoxify.Detoxify`.
+    """
+
+    def __init__(self, name: str, settings: dict, seed: int = 0):
+        super().__init__(name, settings, seed)
+        self.class_names = TOXICITY_LABELS
+
+    def _predict_one(self, text: str):
+        # Mostly low scores, like real-world text
+        return {label: _hash_unit(self.name, label, text) ** 4 for label in self.class_names}
+
+    def predict(self, text):
+        if isinstance(text, str):
+            self._simulate(1)
+            return self._predict_one(text)
+
+        texts = list(text)
+        self._simulate(len(texts))
+        per_text = [self._predict_one(t) for t in texts]
+        return {label: [scores[label] for scores in per_text] for label in self.class_names}
+
+
+class FakeGenerator(FakeModel):
+    """
+    Stand-in for ``text2text-generation`` / ``summarization`` pipelines.
+    """
+
+    def _generate(self, prompt: str):
+        tone = EMOTION_LABELS[int(_hash_unit(self.name, prompt) * len(EMOTION_LABELS))]
+        return (
+            f"1. **Overall Tone:** The text is mostly {tone}. "
+            "2. **Political Context:** No strong leaning is implied. "
+            "3. **Toxicity Level:** No meaningful toxicity. "
+            "4. **Combined Interpretation:** A synthetic summary from the fake backend."
+        )
+
+    def __call__(self, inputs, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        self._simulate(len(texts))
+        return [
+            {"generated_text": self._generate(text), "summary_text": self._generate(text)}
+            for text in texts
+        ]
+
+
+def build_fake_models(config: dict):
+    """
+    Create the fake model objects.
+
+    Args:
+        config (dict): Output of `load_fake_config`.
+
+    Returns:
+        dict: Fakes keyed like the `run_analysis` globals they replace
+        (emotion_classifier, larger_political_model, toxicity_model, summarizer).
+    """
+    seed = config.get("seed", 0)
+    models = config["models"]
+
+    return {
+        "emotion_classifier": FakeTextClassifier("emotion", models["emotion"], EMOTION_LABELS, seed),
+        "larger_political_model": FakeTextClassifier("political", models["political"], POLITICAL_LABELS, seed),
+        "toxicity_model": FakeDetoxify("toxicity", models["toxicity"], seed),
+        "summarizer": FakeGenerator("flan", models["flan"], seed),
+    }
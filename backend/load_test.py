@@ -0,0 +1,193 @@
+"""
+load_test.py
+------------
+Load generator for the Bias Checker API.
+
+Drives ``/api/analyze`` and ``/api/analyze-file`` at a fixed target
+request rate (open loop: requests are sent on schedule whether or not
+earlier ones have finished) and reports latency percentiles and error
+rates per endpoint. Latency is measured from each request's scheduled
+send time, so a saturated server shows up as growing latency instead of
+a silently lower request rate.
+
+Pair with the fake model backend (`fake_models.py`) to test the serving
+layer without loading real models.
+
+Intended Usage:
+    $ BIAS_CHECKER_FAKE_MODELS=1 uvicorn main:app --port 8000 &
+    $ python load_test.py --rate 20 --duration 60 --file-ratio 0.2
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+SAMPLE_TEXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_text.txt")
+
+
+def _analyze_request(base_url: str, text: str, selected: dict, priority: str):
+    """
+    Build a ``POST /api/analyze`` request.
+    """
+    body = json.dumps({
+        "entry": text,
+        "sensitivity": "medium",
+        "selected": selected,
+        "priority": priority,
+    }).encode("utf-8")
+    return urllib.request.Request(
+        f"{base_url}/api/analyze", data=body, headers={"Content-Type": "application/json"}
+    )
+
+
+def _file_request(base_url: str, text: str):
+    """
+    Build a multipart ``POST /api/analyze-file`` request uploading `text`.
+    """
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="load_test.txt"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+        f"{text}\r\n"
+        f"--{boundary}--\r\n"
+    ).encode("utf-8")
+    return urllib.request.Request(
+        f"{base_url}/api/analyze-file",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+
+def _send(request, scheduled: float, timeout: float):
+    """
+    Send one request; return (status, latency in seconds from `scheduled`).
+
+    Status is the HTTP code, or the exception name for connection errors
+    and timeouts.
+    """
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - scheduled
+
+
+def percentile(sorted_values: list, p: float):
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(round(p / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def report(samples: dict, elapsed: float):
+    """
+    Print latency percentiles and error rates per endpoint.
+
+    Args:
+        samples (dict): endpoint → list of (status, latency seconds).
+        elapsed (float): Duration of the send schedule (rate/s is the offered rate).
+    """
+    print(f"\n{'endpoint':<20}{'count':>7}{'rate/s':>9}{'errors':>9}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+    for endpoint, results in sorted(samples.items()):
+        latencies = sorted(latency * 1000 for status, latency in results)
+        errors = [status for status, latency in results if status != 200]
+        error_rate = len(errors) / len(results) if results else 0.0
+
+        print(f"{endpoint:<20}{len(results):>7}{len(results) / elapsed:>9.2f}{error_rate:>8.1%} "
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 90):>10.1f}"
+              f"{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}"
+              f"{latencies[-1] if latencies else float('nan'):>10.1f}")
+
+        if errors:
+            counts = {}
+            for status in errors:
+                counts[status] = counts.get(status, 0) + 1
+            print(f"{'':<20}errors by status: {counts}")
+
+
+# ==============================================
+#  MAIN EXECUTION LOGIC
+# ==============================================
+def main():
+    """
+    Command-line entry point for the load generator.
+    """
+    parser = argparse.ArgumentParser(description="Drive the Bias Checker API at a target request rate.")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Target requests per second.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test length in seconds.")
+    parser.add_argument("--file-ratio", type=float, default=0.0,
+                        help="Fraction of requests sent to /api/analyze-file.")
+    parser.add_argument("--words", type=int, default=150, help="Words of sample text per request.")
+    parser.add_argument("--models", nargs="+", default=["sentiment", "political", "toxicity"],
+                        choices=["sentiment", "political", "toxicity", "toxicity_spans"])
+    parser.add_argument("--priority", default="interactive", choices=["interactive", "bulk"])
+    parser.add_argument("--max-in-flight", type=int, default=256,
+                        help="Client-side concurrency limit (sender threads).")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+    args = parser.parse_args()
+
+    with open(SAMPLE_TEXT_PATH, "r", encoding="utf-8") as f:
+        text = " ".join(f.read().split()[:args.words])
+    selected = {model: True for model in args.models}
+    base_url = args.url.rstrip("/")
+
+    samples = {"/api/analyze": [], "/api/analyze-file": []}
+    samples_lock = threading.Lock()
+
+    def record(endpoint, future):
+        with samples_lock:
+            samples[endpoint].append(future.result())
+
+    if not 0.0 <= args.file_ratio <= 1.0:
+        parser.error("--file-ratio must be between 0 and 1")
+
+    total = int(args.rate * args.duration)
+
+    print(f"\n ==== {total} requests at {args.rate}/s against {base_url} ==== \n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.max_in_flight) as pool:
+        for i in range(total):
+            scheduled = start + i / args.rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            # Accumulator: exactly int(n * ratio) of the first n requests are uploads
+            if int((i + 1) * args.file_ratio) > int(i * args.file_ratio):
+                endpoint, request = "/api/analyze-file", _file_request(base_url, text)
+            else:
+                endpoint = "/api/analyze"
+                request = _analyze_request(base_url, text, selected, args.priority)
+
+            future = pool.submit(_send, request, scheduled, args.timeout)
+            future.add_done_callback(lambda f, e=endpoint: record(e, f))
+
+        # Offered rate covers the send schedule, not the drain of slow responses
+        elapsed = time.perf_counter() - start
+    report({endpoint: results for endpoint, results in samples.items() if results}, elapsed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
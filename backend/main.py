@@ -15,6 +15,9 @@ Primary Responsibilities:
 - API routing and request validation
 - Coordinating NLP model execution
 - File upload handling (.txt and .pdf)
+- Token-level explanations of classifier predictions
+- Optional per-request profiling of slow requests (see `profiling.py`)
+- Optional persistence and querying of past results (see `result_store.py`)
 - Returning structured JSON results for frontend visualization
 
 Intended Usage:
@@ -26,21 +29,29 @@ Author(s):
 """
 
 
-from typing import Dict
+from typing import Dict, Optional
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from run_analysis import (
     analyze_text,
+    run_batch_analysis,
     load_models, 
     run_sentiment_model, 
     run_political_model, 
     run_toxicity_model, 
-    run_flan_summarization_model    
+    run_toxicity_span_model,
+    run_flan_summarization_model,
+    run_explanation_model,
 )
+from bulk_io import extract_pdf_text
+from result_store import get_store, parse_timestamp
+import run_analysis
+from scheduler import scheduler, resolve_priority, client_identity, BULK
+import profiling
 import uvicorn 
-import io
-from PyPDF2 import PdfReader
+import time
 
 # ---------------
 #   App Config
@@ -66,11 +77,23 @@ async def startup_event():
 
     Side Effects:
         - Initializes global model objects in `run_analysis.py`
+        - Starts the inference scheduler threads
         - Increases initial startup time, but reduces request latency
     """
     import asyncio
     loop = asyncio.get_event_loop()
     await loop.run_in_executor(None, load_models)
+    scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    FastAPI shutdown hook that stops the inference scheduler threads.
+    """
+    import asyncio
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, scheduler.stop)
 
 
 app.add_middleware(
@@ -81,11 +104,142 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    """
+    Trace every request's stages and write out profiled or slow ones.
+
+    A full Python/torch profile is captured for requests with an
+    ``X-Profile: 1`` header or picked by the sampling rate; any request
+    over the latency threshold gets its stage breakdown saved. The trace
+    directory is returned in the ``X-Profile-Trace`` response header.
+    """
+    import asyncio
+    trace = profiling.begin(request.url.path, request.headers.get("x-profile"))
+    response = await call_next(request)
+
+    reason = profiling.capture_reason(trace)
+    if reason:
+        # Writing traces (torch exports in particular) must not block the event loop
+        loop = asyncio.get_event_loop()
+        trace_dir = await loop.run_in_executor(
+            None, profiling.write_trace, trace, response.status_code, reason
+        )
+        response.headers["X-Profile-Trace"] = trace_dir
+    return response
+
+
 # ----------------------
 #   Request the Schema 
 # ----------------------
 class TextInput(BaseModel):
     text: str
+
+
+def _request_priority(request: Request, data: dict, default: str = None):
+    """
+    Priority class and client identity of a request, for the scheduler.
+
+    The class comes from the ``"priority"`` body field or ``X-Priority``
+    header (else `default`), subject to any per-API-key pinning; clients
+    are identified by their ``X-API-Key`` header if it is a configured
+    key, else by their address (see `scheduler.client_identity`).
+
+    Returns:
+        tuple[str, str]: (priority class, client id)
+    """
+    api_key = request.headers.get("x-api-key")
+    requested = data.get("priority") or request.headers.get("x-priority") or default
+    client = client_identity(api_key, request.client.host if request.client else None)
+    return resolve_priority(requested, api_key), client
+
+
+async def _schedule(request: Request, data: dict, fn, *args, default: str = None):
+    """
+    Run blocking model work `fn(*args)` on the inference scheduler.
+
+    Applies the request's priority class and client identity, records
+    the time spent queued, and profiles the work if the request is
+    being profiled.
+    """
+    priority, client = _request_priority(request, data, default)
+    queued = time.perf_counter()
+
+    def job():
+        profiling.record_stage("queue_wait", queued, time.perf_counter())
+        return profiling.profiled(fn)(*args)
+
+    return await scheduler.run(job, priority=priority, client=client)
+
+
+def _published_times(data: dict, count: int):
+    """
+    Validated ``published_at`` per stored text (or None for "now").
+
+    ``published_at`` may be one timestamp for all texts or a list with
+    one timestamp (or null) per text.
+
+    Raises:
+        HTTPException(400): Invalid timestamp or list length
+    """
+    published = data.get("published_at")
+    if not isinstance(published, list):
+        published = [published] * count
+    elif len(published) != count:
+        raise HTTPException(status_code=400, detail="'published_at' must have one entry per text.")
+
+    try:
+        return [parse_timestamp(value) if value is not None else None for value in published]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _day_filter(value: Optional[str], name: str):
+    """
+    Validate a ``start`` / ``end`` query parameter and return its UTC day
+    (``YYYY-MM-DD``), or None if it was not given.
+
+    Raises:
+        HTTPException(400): Value is not an ISO 8601 date/datetime
+    """
+    if not value:
+        return None
+    try:
+        return parse_timestamp(value).strftime("%Y-%m-%d")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"'{name}': {e}")
+
+
+async def _store_results(data: dict, texts: list, results: list, published: list):
+    """
+    Persist analyses in the result store (off the event loop).
+
+    Uses the request's optional ``source`` and ``metadata`` fields and
+    the timestamps from `_published_times`.
+    """
+    import asyncio
+    store = get_store()
+    source = data.get("source")
+    metadata = data.get("metadata")
+
+    def save_all():
+        for text, result, published_at in zip(texts, results, published):
+            store.save(
+                text, result, run_analysis.model_version or "unknown",
+                source, metadata, published_at,
+            )
+
+    loop = asyncio.get_event_loop()
+    with profiling.stage("store"):
+        await loop.run_in_executor(None, save_all)
+
+
+def _json_response(content: dict):
+    """
+    Serialize a response body, timed as the ``serialize`` stage.
+    """
+    with profiling.stage("serialize"):
+        return JSONResponse(content=content)
     
 
 # ------------
@@ -101,7 +255,7 @@ def home():
     Returns:
         dict: A simple JSON message confirming that the API is running.
     """
-    return {"message": "Bias Checker API running. Use POST /api/analyze or /api/analyze-file."}
+    return {"message": "Bias Checker API running. Use POST /api/analyze, /api/explain or /api/analyze-file."}
 
 
 @app.post("/api/analyze")
@@ -122,14 +276,29 @@ async def analyze_text_endpoint(request: Request):
             "selected": {
                 "sentiment": true,
                 "political": true,
-                "toxicity": false
-            }
+                "toxicity": false,
+                "toxicity_spans": false
+            },
+            "priority": "interactive|bulk",
+            "store": false,
+            "source": "optional source name",
+            "metadata": {},
+            "published_at": "2024-03-01T08:30:00Z"
         }
 
     Behavior:
         - Only runs models explicitly selected by the user
+        - ``toxicity_spans`` scores each sentence (in batched calls) and
+          returns the offending spans with offsets plus document-level maxima
         - Skips summarization for very short text inputs
         - Uses FLAN-based summarization to interpret combined results
+        - Model work is queued on the inference scheduler: interactive
+          requests run before bulk ones, and clients (``X-API-Key``) are
+          served round-robin within a class
+        - With ``"store": true`` the results are saved (text hash, source,
+          metadata, timestamp, model version) for `/api/results` queries,
+          dated by ``published_at`` if given; a text already stored for
+          the same source and model version is not stored again
 
     Returns:
         dict: JSON object containing:
@@ -137,42 +306,270 @@ async def analyze_text_endpoint(request: Request):
             - sensitivity (str): Echoed sensitivity setting
 
     Raises:
+        HTTPException(400): Invalid ``published_at``
         HTTPException(500): If an unexpected server-side error occurs
     """
     try:
-        data = await request.json()
+        with profiling.stage("parse_request"):
+            data = await request.json()
         print("Received data:", data)
 
         # Get the text and selected biases, sensitivity doesn't really do anything yet
         text = data.get("entry", "")
         sensitivity = data.get("sensitivity", "")
         selected = data.get("selected", {})
+        published = _published_times(data, 1) if data.get("store") else None
+
+        results = await _schedule(request, data, _run_selected_analyses, text, sensitivity, selected)
+
+        if data.get("store"):
+            await _store_results(data, [text], [results], published)
+
+        return _json_response({"results": results, "sensitivity": sensitivity})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _run_selected_analyses(text: str, sensitivity: str, selected: dict):
+    """
+    Run the selected models and the summary for one text (blocking).
+
+    Executed on an inference scheduler thread by `/api/analyze`.
 
-        results = {}
-
-        # Run only the selected analyses
-        if selected.get("sentiment"):
-            results["sentiment"] = run_sentiment_model(text, sensitivity)
-        if selected.get("political"):
-            results["political"] = run_political_model(text, sensitivity)
-        if selected.get("toxicity"):
-            results["toxicity"] = run_toxicity_model(text, sensitivity)
-
-        # Printing results and the type for debugging
-        min_words = 25
-        if len(text.split()) < min_words:
-            results["summary"] = f"Summary skipped: text too short — needs at least {min_words} words."
-        else:
-            results["summary"] = run_flan_summarization_model(text, results)
-        if results.get("summary"):
-            print("Summarization result:", results["summary"])  
-        
-        return {"results": results, "sensitivity": sensitivity}
+    Returns:
+        dict: Outputs of each selected analysis plus the summary.
+    """
+    results = {}
+
+    # Run only the selected analyses
+    if selected.get("sentiment"):
+        results["sentiment"] = run_sentiment_model(text, sensitivity)
+    if selected.get("political"):
+        results["political"] = run_political_model(text, sensitivity)
+    if selected.get("toxicity"):
+        results["toxicity"] = run_toxicity_model(text, sensitivity)
+    if selected.get("toxicity_spans"):
+        results["toxicity_spans"] = run_toxicity_span_model(text, sensitivity)
+
+    # Printing results and the type for debugging
+    min_words = 25
+    if len(text.split()) < min_words:
+        results["summary"] = f"Summary skipped: text too short — needs at least {min_words} words."
+    else:
+        results["summary"] = run_flan_summarization_model(text, results)
+    if results.get("summary"):
+        print("Summarization result:", results["summary"])  
+
+    return results
+
+
+@app.post("/api/analyze-batch")
+async def analyze_batch_endpoint(request: Request):
+    """
+    Analyze a batch of texts with batched model calls.
+
+    Intended for bulk clients such as the distributed coordinator
+    (`coordinator.py`), which sends each shard of a corpus to a node as
+    one request. Runs in the ``bulk`` priority class unless the request
+    asks otherwise. Entries are queued as separate scheduler jobs of
+    ``batch_size`` texts, so interactive requests run between chunks
+    instead of waiting for the whole batch.
+
+    Request JSON Format::
+
+        {
+            "entries": ["First text", "Second text"],
+            "selected": {
+                "sentiment": true,
+                "political": true,
+                "toxicity": true,
+                "toxicity_spans": false,
+                "summary": false
+            },
+            "batch_size": 16,
+            "store": false,
+            "source": "optional source name",
+            "metadata": {},
+            "published_at": ["2024-03-01", null]
+        }
+
+    ``published_at`` is optional: one timestamp for all entries or one
+    (or null) per entry; it dates stored results.
+
+    Returns:
+        dict: JSON object containing:
+            - results (list[dict]): Per-entry outputs, in input order
+            - model_version (str): Version of the models that produced them
+
+    Raises:
+        HTTPException(400): If ``entries`` is not a list of strings, ``batch_size`` is not
+            a positive integer, or ``published_at`` is invalid
+        HTTPException(500): If an unexpected server-side error occurs
+    """
+    data = await request.json()
+
+    entries = data.get("entries")
+    if not isinstance(entries, list) or not all(isinstance(entry, str) for entry in entries):
+        raise HTTPException(status_code=400, detail="'entries' must be a list of texts.")
+
+    selected = data.get("selected", {})
+    batch_size = data.get("batch_size", 16)
+    if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+        raise HTTPException(status_code=400, detail="'batch_size' must be a positive integer.")
+    published = _published_times(data, len(entries)) if data.get("store") else None
+
+    try:
+        results = []
+        for start in range(0, len(entries), batch_size):
+            results.extend(await _schedule(
+                request, data, run_batch_analysis,
+                entries[start:start + batch_size], selected, batch_size, default=BULK,
+            ))
+
+        if data.get("store"):
+            await _store_results(data, entries, results, published)
+
+        return _json_response({"results": results, "model_version": run_analysis.model_version})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/explain")
+async def explain_text_endpoint(request: Request):
+    """
+    Explain a classifier prediction with per-token attributions.
+
+    Highlights which words pushed the emotion or political model
+    towards its predicted label (e.g. "why was this labeled Right").
+    Attributions are computed with batched integrated gradients and
+    cached by text hash, so repeated requests are cheap.
+
+    Request JSON Format::
+
+        {
+            "entry": "Text to explain",
+            "model": "emotion|political",
+            "steps": 20,
+            "priority": "interactive|bulk"
+        }
+
+    Returns:
+        dict: JSON object containing:
+            - model (str): Echoed model name
+            - explanation (dict): Predicted label, score and token attributions
+
+    Raises:
+        HTTPException(400): Unknown model, missing/empty text or invalid ``steps``
+        HTTPException(500): If the explanation could not be computed
+    """
+    data = await request.json()
+
+    text = data.get("entry", "")
+    model = data.get("model", "political")
+    steps = data.get("steps")
+
+    if model not in ("emotion", "political"):
+        raise HTTPException(status_code=400, detail="Model must be 'emotion' or 'political'.")
+    if not isinstance(text, str):
+        raise HTTPException(status_code=400, detail="'entry' must be a string.")
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Empty text")
+    if steps is not None and (not isinstance(steps, int) or isinstance(steps, bool) or steps < 1):
+        raise HTTPException(status_code=400, detail="'steps' must be a positive integer.")
+
+    explanation = await _schedule(request, data, run_explanation_model, text, model, steps)
+    if explanation is None:
+        raise HTTPException(status_code=500, detail="Explanation failed")
+
+    return _json_response({"model": model, "explanation": explanation})
+
+
+@app.get("/api/results")
+async def list_results_endpoint(
+    source: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    model_version: Optional[str] = None,
+    text_hash: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+):
+    """
+    List stored analyses, newest first, without running any model.
+
+    Query Parameters:
+        - source: Only analyses from this source
+        - start / end: Inclusive days (ISO 8601 dates or datetimes, taken as UTC days)
+        - model_version: Only results produced by this model version
+        - text_hash: SHA-256 of a text, to find earlier analyses of it
+        - limit / offset: Paging (limit 1 to 1000, offset at least 0)
+
+    Returns:
+        dict: JSON object containing:
+            - analyses (list[dict]): Stored rows with scores, metadata and full results
+
+    Raises:
+        HTTPException(400): Invalid ``start`` / ``end`` or negative ``offset``
+    """
+    import asyncio
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="'offset' must be at least 0.")
+    limit = max(1, min(limit, 1000))
+    start, end = _day_filter(start, "start"), _day_filter(end, "end")
+
+    loop = asyncio.get_event_loop()
+    analyses = await loop.run_in_executor(
+        None,
+        lambda: get_store().query(
+            source, start, end, model_version, text_hash, limit, offset
+        ),
+    )
+    return _json_response({"analyses": analyses})
+
+
+@app.get("/api/results/summary")
+async def summarize_results_endpoint(
+    source: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    model_version: Optional[str] = None,
+    group_by: Optional[str] = None,
+):
+    """
+    Aggregate stored analyses from precomputed daily rollups.
+
+    Answers reporting questions such as "political lean distribution of
+    source X last month" without touching the models or scanning rows.
+
+    Query Parameters:
+        - source, start, end, model_version: Filters (as in `/api/results`)
+        - group_by: ``day``, ``source`` or ``model_version`` (default: one group)
+
+    Returns:
+        dict: JSON object containing:
+            - groups (list[dict]): Counts, political label distribution and
+              mean scores, emotion/toxicity label counts, mean/max toxicity
+
+    Raises:
+        HTTPException(400): Invalid ``start`` / ``end`` or ``group_by``
+    """
+    import asyncio
+    start, end = _day_filter(start, "start"), _day_filter(end, "end")
+    loop = asyncio.get_event_loop()
+    try:
+        groups = await loop.run_in_executor(
+            None, lambda: get_store().summary(source, start, end, model_version, group_by)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _json_response({"groups": groups})
+
+
 @app.post("/api/analyze-file")
 async def analyze_file(file: UploadFile = File(...)):
     """
@@ -222,13 +619,12 @@ async def analyze_file(file: UploadFile = File(...)):
 
     else:  # PDF
         try:
-            pdf_stream = io.BytesIO(data)
-            reader = PdfReader(pdf_stream)
-            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+            with profiling.stage("pdf_parse"):
+                text = profiling.profiled(extract_pdf_text)(data)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"PDF extraction failed: {e}")
 
-    return { "extracted_text": text }
+    return _json_response({ "extracted_text": text })
     
 
 
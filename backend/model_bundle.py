@@ -0,0 +1,255 @@
+"""
+model_bundle.py
+---------------
+Offline model bundle for the Bias Checker backend.
+
+Snapshots exactly the models that `run_analysis.load_models()` uses into
+a local directory so containers can start without network access:
+
+- Every Hugging Face model is saved as safetensors, which
+  `from_pretrained` memory-maps instead of unpickling
+- Revisions are resolved to commit hashes and pinned in ``manifest.json``
+- The Detoxify checkpoint is converted to a regular transformers model
+  directory, so it is mmap-loaded the same way
+
+Intended Usage:
+    $ python model_bundle.py build ./model_bundle
+    $ python model_bundle.py build ./model_bundle --revisions old/manifest.json
+    $ BIAS_CHECKER_MODEL_BUNDLE=./model_bundle uvicorn main:app
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from transformers import (
+    AutoTokenizer,
+    AutoModelForSequenceClassification,
+    AutoModelForSeq2SeqLM,
+)
+from detoxify import Detoxify
+
+from model_sources import MODEL_SOURCES, TOXICITY_MODEL_TYPE
+
+# Environment variable pointing `load_models()` at a bundle directory
+MODEL_BUNDLE_ENV = "BIAS_CHECKER_MODEL_BUNDLE"
+
+MANIFEST_NAME = "manifest.json"
+TOXICITY_KEY = "toxicity"
+
+# What is saved for each entry of `model_sources.MODEL_SOURCES`:
+# (model class or None, whether to save the tokenizer)
+BUNDLE_CONTENTS = {
+    "emotion": (AutoModelForSequenceClassification, True),
+    "summarizer": (AutoModelForSeq2SeqLM, True),
+    "political": (AutoModelForSequenceClassification, False),   # uses political_tokenizer
+    "political_tokenizer": (None, True),
+    "flan": (AutoModelForSeq2SeqLM, True),
+}
+
+
+# ===============================
+#   BUILDING A BUNDLE
+# ===============================
+
+def resolve_revision(repo_id: str, revision: str = None):
+    """
+    Resolve a branch/tag (default "main") to an immutable commit hash.
+
+    Args:
+        repo_id (str): Hugging Face repository id.
+        revision (str, optional): Branch, tag or commit hash.
+
+    Returns:
+        str: Commit hash of the requested revision.
+    """
+    from huggingface_hub import HfApi
+
+    return HfApi().model_info(repo_id, revision=revision).sha
+
+
+def build_bundle(bundle_dir: str, sources: dict, toxicity_type: str, revisions: dict = None):
+    """
+    Download and save all models into `bundle_dir`.
+
+    Args:
+        bundle_dir (str): Output directory (created if missing).
+        sources (dict): Bundle key → Hugging Face repository id
+            (normally `model_sources.MODEL_SOURCES`).
+        toxicity_type (str): Detoxify model type (e.g. "unbiased").
+        revisions (dict, optional): Bundle key → revision to pin. Keys
+            that are missing are resolved from the default branch.
+
+    Returns:
+        dict: The manifest written to ``manifest.json``.
+    """
+    revisions = revisions or {}
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    manifest = {"models": {}, "toxicity": None}
+
+    for key, repo_id in sources.items():
+        if key not in BUNDLE_CONTENTS:
+            raise ValueError(f"No bundle contents registered for '{key}'")
+        model_class, with_tokenizer = BUNDLE_CONTENTS[key]
+
+        sha = resolve_revision(repo_id, revisions.get(key))
+        target = os.path.join(bundle_dir, key)
+        print(f"Bundling {key}: {repo_id}@{sha}")
+
+        if with_tokenizer:
+            tokenizer = AutoTokenizer.from_pretrained(repo_id, revision=sha)
+            tokenizer.save_pretrained(target)
+
+        if model_class is not None:
+            model = model_class.from_pretrained(repo_id, revision=sha)
+            model.save_pretrained(target, safe_serialization=True)
+            del model
+
+        manifest["models"][key] = {"repo": repo_id, "revision": sha, "path": key}
+
+    # Detoxify ships a Lightning checkpoint; store it as a plain
+    # transformers model so it can be memory-mapped like the others.
+    print(f"Bundling {TOXICITY_KEY}: detoxify/{toxicity_type}")
+    detox = Detoxify(toxicity_type)
+    target = os.path.join(bundle_dir, TOXICITY_KEY)
+    detox.model.save_pretrained(target, safe_serialization=True)
+    detox.tokenizer.save_pretrained(target)
+    manifest["toxicity"] = {
+        "model_type": toxicity_type,
+        "class_names": list(detox.class_names),
+        "path": TOXICITY_KEY,
+    }
+
+    with open(os.path.join(bundle_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Bundle written to {bundle_dir}")
+    return manifest
+
+
+# ===============================
+#   LOADING A BUNDLE
+# ===============================
+
+class BundledDetoxify(Detoxify):
+    """
+    Detoxify predictor backed by a bundled, safetensors model directory.
+
+    Skips Detoxify's checkpoint download/unpickling and reuses its
+    `predict` implementation unchanged.
+    """
+
+    def __init__(self, model_dir: str, class_names: list, device: str = "cpu"):
+        self.model = AutoModelForSequenceClassification.from_pretrained(
+            model_dir, use_safetensors=True, low_cpu_mem_usage=True
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.class_names = class_names
+        self.device = device
+        self.model.to(self.device)
+
+
+class ModelBundle:
+    """
+    Read-only view of a bundle directory created by `build_bundle`.
+    """
+
+    def __init__(self, bundle_dir: str):
+        self.bundle_dir = os.path.abspath(bundle_dir)
+
+        manifest_path = os.path.join(self.bundle_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No {MANIFEST_NAME} in model bundle {self.bundle_dir}")
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+    def path(self, key: str):
+        """
+        Local directory of a bundled model (usable in place of a repo id).
+        """
+        entry = self.manifest["models"].get(key)
+        if entry is None:
+            raise KeyError(f"Model '{key}' is missing from bundle {self.bundle_dir}")
+        return os.path.join(self.bundle_dir, entry["path"])
+
+    def revisions(self):
+        """
+        Bundle key → pinned commit hash, as recorded in the manifest.
+        """
+        return {key: entry["revision"] for key, entry in self.manifest["models"].items()}
+
+    def load_detoxify(self):
+        """
+        Load the bundled toxicity model.
+
+        Returns:
+            BundledDetoxify: Drop-in replacement for `Detoxify(model_type)`.
+        """
+        entry = self.manifest["toxicity"]
+        return BundledDetoxify(
+            os.path.join(self.bundle_dir, entry["path"]),
+            entry["class_names"],
+        )
+
+
+def open_bundle(bundle_dir: str = None):
+    """
+    Open the model bundle and switch Hugging Face libraries to offline mode.
+
+    Args:
+        bundle_dir (str, optional): Bundle directory. Defaults to the
+            ``BIAS_CHECKER_MODEL_BUNDLE`` environment variable.
+
+    Returns:
+        ModelBundle or None: The bundle, or None if none is configured.
+    """
+    bundle_dir = bundle_dir or os.environ.get(MODEL_BUNDLE_ENV)
+    if not bundle_dir:
+        return None
+
+    # Everything is read from local paths; make any stray hub lookups fail fast
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+    return ModelBundle(bundle_dir)
+
+
+# ==============================================
+#  MAIN EXECUTION LOGIC
+# ==============================================
+def main():
+    """
+    Command-line entry point for building a model bundle.
+
+    Intended Usage:
+        $ python model_bundle.py build <bundle_dir> [--revisions manifest.json]
+    """
+    parser = argparse.ArgumentParser(description="Build an offline model bundle.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Snapshot all models used by load_models().")
+    build.add_argument("bundle_dir", help="Output directory for the bundle.")
+    build.add_argument(
+        "--revisions",
+        help="Existing manifest.json whose pinned revisions should be reused.",
+    )
+
+    args = parser.parse_args()
+
+    revisions = {}
+    if args.revisions:
+        with open(args.revisions, "r", encoding="utf-8") as f:
+            pinned = json.load(f)
+        revisions = {key: entry["revision"] for key, entry in pinned["models"].items()}
+
+    build_bundle(args.bundle_dir, MODEL_SOURCES, TOXICITY_MODEL_TYPE, revisions)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+model_sources.py
+----------------
+Model repositories used by the Bias Checker backend.
+
+Kept free of third-party imports so that `model_bundle.py` can read the
+list at image build time without importing the whole analysis stack.
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+# Hugging Face repositories loaded by `run_analysis.load_models()` (also
+# what model_bundle.py snapshots for offline use)
+MODEL_SOURCES = {
+    "emotion": "bhadresh-savani/bert-base-uncased-emotion",
+    "summarizer": "facebook/bart-large-cnn",
+    "political": "matous-volf/political-leaning-deberta-large",
+    "political_tokenizer": "microsoft/deberta-v3-large",
+    "flan": "google/flan-t5-large",
+}
+
+# Detoxify model type loaded for toxicity scoring
+TOXICITY_MODEL_TYPE = "unbiased"
@@ -0,0 +1,335 @@
+"""
+profiling.py
+------------
+On-demand profiling of slow API requests.
+
+Every request gets a lightweight trace that records how long each stage
+took (request parsing, tokenization, forward pass, generation, PDF
+parsing, JSON serialization, ...). On top of that, a full Python
+(cProfile) and torch profile of the model work is captured when:
+
+- The request sends an ``X-Profile: 1`` header, or
+- It is randomly sampled (``BIAS_CHECKER_PROFILE_SAMPLE_RATE``, 0.0–1.0)
+
+Traces are written to ``BIAS_CHECKER_PROFILE_DIR`` (default ``profiles/``)
+for profiled requests, and automatically for any request slower than
+``BIAS_CHECKER_PROFILE_SLOW_MS`` (stage breakdown only, unless it was
+also profiled). Each capture is a directory containing:
+
+- ``trace.json``: endpoint, status, total and per-stage timings
+- ``python.prof``: cProfile stats (e.g. ``python -m pstats`` or snakeviz)
+- ``torch-N.json``: torch profiler traces (open in chrome://tracing / Perfetto)
+
+Disk use is bounded: at most ``BIAS_CHECKER_PROFILE_MAX_TRACES`` capture
+directories are kept (oldest are deleted first), and slow-request
+captures are rate limited to one per ``BIAS_CHECKER_PROFILE_SLOW_INTERVAL_S``
+seconds, so sustained overload cannot fill the disk.
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from contextlib import contextmanager
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import pstats
+import random
+import shutil
+import threading
+import time
+import uuid
+
+import torch
+
+PROFILE_DIR = os.environ.get("BIAS_CHECKER_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.environ.get("BIAS_CHECKER_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("BIAS_CHECKER_PROFILE_SLOW_MS", "0"))
+PROFILE_MAX_TRACES = int(os.environ.get("BIAS_CHECKER_PROFILE_MAX_TRACES", "200"))
+PROFILE_SLOW_INTERVAL_S = float(os.environ.get("BIAS_CHECKER_PROFILE_SLOW_INTERVAL_S", "1"))
+
+_current_trace = contextvars.ContextVar("bias_checker_trace", default=None)
+# Held while a cProfile/torch capture is running (one at a time per process)
+_profile_lock = threading.Lock()
+_capture_lock = threading.Lock()
+_last_slow_capture = 0.0
+
+
+class RequestTrace:
+    """
+    Timings (and optional profiles) collected for one request.
+
+    Args:
+        endpoint (str): Request path.
+        profile (bool): Whether to capture full Python/torch profiles.
+    """
+
+    def __init__(self, endpoint: str, profile: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.profile = profile
+        self.started = time.time()
+        self.total_ms = None
+        self._start = time.perf_counter()
+        self.stages = []
+        self.python_profiles = []
+        self.torch_traces = []
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, start: float, end: float):
+        """
+        Record one timed stage (perf_counter timestamps).
+        """
+        with self._lock:
+            self.stages.append({
+                "stage": name,
+                "start_ms": round((start - self._start) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "thread": threading.current_thread().name,
+            })
+
+    def elapsed_ms(self):
+        """
+        Milliseconds since the request started.
+        """
+        return (time.perf_counter() - self._start) * 1000
+
+
+def begin(endpoint: str, profile_header: str = None):
+    """
+    Start tracing the current request.
+
+    Args:
+        endpoint (str): Request path.
+        profile_header (str, optional): Value of the ``X-Profile`` header.
+
+    Returns:
+        RequestTrace: The trace, also made current for this context.
+    """
+    requested = str(profile_header).lower() in ("1", "true", "yes")
+    sampled = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    trace = RequestTrace(endpoint, profile=requested or sampled)
+    _current_trace.set(trace)
+    return trace
+
+
+def capture_reason(trace: RequestTrace):
+    """
+    Finish a trace and decide whether it should be written out.
+
+    Cheap enough to call inline for every request; only traces that
+    are returned a reason need `write_trace`.
+
+    Args:
+        trace (RequestTrace): Trace returned by `begin`.
+
+    Returns:
+        str or None: Why the trace is captured ("profiled" or slow), or
+        None if it is not (including slow requests over the rate limit).
+    """
+    global _last_slow_capture
+
+    trace.total_ms = trace.elapsed_ms()
+    if trace.profile:
+        return "profiled"
+
+    if PROFILE_SLOW_MS <= 0 or trace.total_ms < PROFILE_SLOW_MS:
+        return None
+
+    with _capture_lock:
+        now = time.monotonic()
+        if now - _last_slow_capture < PROFILE_SLOW_INTERVAL_S:
+            return None
+        _last_slow_capture = now
+    return f"slower than {PROFILE_SLOW_MS:g} ms"
+
+
+def write_trace(trace: RequestTrace, status: int, reason: str):
+    """
+    Write trace.json, python.prof and torch traces to a new directory.
+
+    Blocking (torch exports in particular); the oldest capture
+    directories beyond ``BIAS_CHECKER_PROFILE_MAX_TRACES`` are deleted.
+
+    Args:
+        trace (RequestTrace): Trace passed to `capture_reason`.
+        status (int): HTTP status code of the response.
+        reason (str): Value returned by `capture_reason`.
+
+    Returns:
+        str: Directory the trace was written to.
+    """
+    total_ms = trace.total_ms
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(trace.started))
+    name = trace.endpoint.strip("/").replace("/", "_") or "root"
+    directory = os.path.join(PROFILE_DIR, f"{stamp}-{name}-{trace.id}")
+    os.makedirs(directory, exist_ok=True)
+
+    summary = {
+        "id": trace.id,
+        "endpoint": trace.endpoint,
+        "status": status,
+        "reason": reason,
+        "started": trace.started,
+        "total_ms": round(total_ms, 3),
+        "stages": sorted(trace.stages, key=lambda s: s["start_ms"]),
+    }
+
+    if trace.python_profiles:
+        stats = pstats.Stats(trace.python_profiles[0])
+        for profile in trace.python_profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(os.path.join(directory, "python.prof"))
+        summary["python_profile"] = "python.prof"
+
+    torch_files = []
+    for index, profiler in enumerate(trace.torch_traces):
+        file_name = f"torch-{index}.json"
+        profiler.export_chrome_trace(os.path.join(directory, file_name))
+        torch_files.append(file_name)
+    if torch_files:
+        summary["torch_traces"] = torch_files
+
+    with open(os.path.join(directory, "trace.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"Request trace written to {directory} ({reason}, {total_ms:.0f} ms)")
+    _prune_traces()
+    return directory
+
+
+def _prune_traces():
+    """
+    Delete the oldest capture directories beyond the retention limit.
+    """
+    with _capture_lock:
+        try:
+            entries = [entry for entry in os.scandir(PROFILE_DIR) if entry.is_dir()]
+        except FileNotFoundError:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:max(0, len(entries) - PROFILE_MAX_TRACES)]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a block as a named stage of the current request (if traced).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, start, time.perf_counter())
+
+
+def record_stage(name: str, start: float, end: float):
+    """
+    Record an already measured span (perf_counter timestamps) as a stage.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(name, start, end)
+
+
+def profiled(fn):
+    """
+    Wrap `fn` so it runs under cProfile and the torch profiler when the
+    current request is being profiled.
+
+    The wrapper must run in the context of the request (the inference
+    scheduler propagates it to its worker threads). Only one capture
+    runs at a time: calls made while another one is active (nested calls,
+    or other scheduler workers) run unprofiled. Profiling never fails the
+    request; if a profiler cannot start or stop, `fn` runs (or its result
+    is returned) without a profile.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = _current_trace.get()
+        if trace is None or not trace.profile:
+            return fn(*args, **kwargs)
+        if not _profile_lock.acquire(blocking=False):
+            return fn(*args, **kwargs)
+
+        try:
+            try:
+                python_profile = cProfile.Profile()
+                torch_profile = torch.profiler.profile(
+                    activities=[torch.profiler.ProfilerActivity.CPU],
+                    record_shapes=True,
+                )
+                torch_profile.__enter__()
+            except Exception as e:
+                print(f"Profiling skipped: {e}")
+                return fn(*args, **kwargs)
+
+            try:
+                python_profile.enable()
+            except Exception as e:
+                print(f"Python profiling skipped: {e}")
+                python_profile = None
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                try:
+                    if python_profile is not None:
+                        python_profile.disable()
+                    torch_profile.__exit__(None, None, None)
+                except Exception as e:
+                    print(f"Profiling failed: {e}")
+                else:
+                    with trace._lock:
+                        if python_profile is not None:
+                            trace.python_profiles.append(python_profile)
+                        trace.torch_traces.append(torch_profile)
+        finally:
+            _profile_lock.release()
+
+    return wrapper
+
+
+def _timed(name: str, method):
+    """
+    Wrap a bound method so each call is recorded as stage `name`.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_pipeline(pipe, name: str):
+    """
+    Record tokenization, forward pass and post-processing of a
+    transformers pipeline as separate stages.
+
+    For generation pipelines the forward stage is the generation loop.
+    Objects without these methods (e.g. fake models) are left alone.
+    """
+    forward_stage = "generate" if pipe.__class__.__name__.startswith(("Text2Text", "Summarization")) else "forward"
+
+    for method, label in (("preprocess", "tokenize"), ("_forward", forward_stage), ("postprocess", "postprocess")):
+        if hasattr(pipe, method):
+            setattr(pipe, method, _timed(f"{name}.{label}", getattr(pipe, method)))
+
+
+def instrument_module(module, name: str):
+    """
+    Record the forward pass of a torch module (e.g. Detoxify's model) as a stage.
+    """
+    if hasattr(module, "forward"):
+        module.forward = _timed(f"{name}.forward", module.forward)
@@ -0,0 +1,418 @@
+"""
+result_store.py
+---------------
+Indexed local store of past analysis results.
+
+Analyses submitted with ``"store": true`` are saved to a SQLite database
+(``BIAS_CHECKER_RESULT_DB``, default ``results.db``) together with their
+text hash, source, metadata, timestamp and model version. The main
+per-model scores are kept in indexed columns, and daily rollups per
+source are maintained on every insert, so reporting questions such as
+"what was the political lean distribution of source X last month" are
+answered from the rollups without touching the models or scanning rows.
+
+Each text is stored at most once per source and model version, so
+retried or resubmitted analyses do not inflate the rollups. Rows are
+dated by an optional client-supplied ``published_at`` timestamp (e.g.
+when backfilling an archive), falling back to the time of insertion.
+
+Tables:
+    - analyses: one row per stored analysis (full results as JSON)
+    - daily_rollups: per day/source/model version counts and score sums
+    - label_rollups: per day/source/model version label counts
+      (top political label, top emotion, top toxicity category)
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+RESULT_DB_ENV = "BIAS_CHECKER_RESULT_DB"
+
+# Top toxicity category only counts as a label above this score
+TOXIC_LABEL_THRESHOLD = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text_hash TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    metadata TEXT,
+    created_at TEXT NOT NULL,
+    published_at TEXT,
+    day TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    sentiment_label TEXT,
+    sentiment_score REAL,
+    political_label TEXT,
+    political_left REAL,
+    political_center REAL,
+    political_right REAL,
+    toxicity_label TEXT,
+    toxicity_max REAL,
+    results TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_source_day ON analyses (source, day);
+CREATE INDEX IF NOT EXISTS idx_analyses_day ON analyses (day);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analyses_identity
+    ON analyses (text_hash, source, model_version);
+
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    analyses INTEGER NOT NULL DEFAULT 0,
+    political_n INTEGER NOT NULL DEFAULT 0,
+    political_left_sum REAL NOT NULL DEFAULT 0,
+    political_center_sum REAL NOT NULL DEFAULT 0,
+    political_right_sum REAL NOT NULL DEFAULT 0,
+    toxicity_n INTEGER NOT NULL DEFAULT 0,
+    toxicity_max_sum REAL NOT NULL DEFAULT 0,
+    toxicity_max_max REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, source, model_version)
+);
+
+CREATE TABLE IF NOT EXISTS label_rollups (
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, source, model_version, model, label)
+);
+"""
+
+
+def text_hash(text: str):
+    """
+    SHA-256 of the analyzed text (the text itself is not stored).
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 date or datetime (naive values are taken as UTC).
+
+    Args:
+        value (str or datetime): e.g. ``"2024-03-01"`` or ``"2024-03-01T08:30:00Z"``.
+
+    Returns:
+        datetime: Timezone-aware UTC datetime.
+
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 date/datetime.
+    """
+    if not isinstance(value, datetime):
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid timestamp: {value!r} (expected an ISO 8601 string)")
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value!r} (expected ISO 8601, e.g. 2024-03-01)")
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _summarize(results: dict):
+    """
+    Pull the indexed columns out of an `/api/analyze` results dict.
+    """
+    row = {
+        "sentiment_label": None, "sentiment_score": None,
+        "political_label": None, "political_left": None,
+        "political_center": None, "political_right": None,
+        "toxicity_label": None, "toxicity_max": None,
+    }
+
+    sentiment = results.get("sentiment")
+    if sentiment:
+        row["sentiment_label"] = sentiment["top"]["label"]
+        row["sentiment_score"] = sentiment["top"]["score"]
+
+    political = results.get("political")
+    if political:
+        scores = {item["label"]: item["score"] for item in political}
+        row["political_label"] = max(scores, key=scores.get)
+        row["political_left"] = scores.get("Left")
+        row["political_center"] = scores.get("Center")
+        row["political_right"] = scores.get("Right")
+
+    toxicity = results.get("toxicity")
+    if toxicity and "error" not in toxicity:
+        label, score = max(toxicity.items(), key=lambda x: x[1])
+        row["toxicity_max"] = score
+        row["toxicity_label"] = label if score >= TOXIC_LABEL_THRESHOLD else "None"
+
+    return row
+
+
+class ResultStore:
+    """
+    SQLite-backed store of analysis results with precomputed rollups.
+
+    Args:
+        path (str): Database file (created if missing).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+
+    def save(self, text: str, results: dict, model_version: str, source: str = None,
+             metadata: dict = None, published_at=None):
+        """
+        Store one analysis and update its rollups in the same transaction.
+
+        An analysis of the same text, source and model version that is
+        already stored is kept as is, and the rollups are left unchanged.
+
+        Args:
+            text (str): Analyzed text (only its hash is stored).
+            results (dict): Results as returned by `/api/analyze`.
+            model_version (str): Version of the models that produced them.
+            source (str, optional): Where the text came from (outlet, feed, ...).
+            metadata (dict, optional): Free-form JSON metadata.
+            published_at (str or datetime, optional): When the text was
+                published; dates the row and its rollups. Defaults to now.
+
+        Returns:
+            int or None: Row id of the stored analysis, or None if it was
+            already stored.
+
+        Raises:
+            ValueError: If `published_at` is not a valid ISO 8601 timestamp.
+        """
+        now = datetime.now(timezone.utc)
+        published = parse_timestamp(published_at) if published_at is not None else None
+        source = source or ""
+        row = _summarize(results)
+        day = (published or now).strftime("%Y-%m-%d")
+
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                """
+                INSERT OR IGNORE INTO analyses (
+                    text_hash, source, metadata, created_at, published_at, day, model_version,
+                    sentiment_label, sentiment_score, political_label, political_left,
+                    political_center, political_right, toxicity_label, toxicity_max, results
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    text_hash(text), source, json.dumps(metadata) if metadata else None,
+                    now.isoformat(), published.isoformat() if published else None, day, model_version,
+                    row["sentiment_label"], row["sentiment_score"], row["political_label"],
+                    row["political_left"], row["political_center"], row["political_right"],
+                    row["toxicity_label"], row["toxicity_max"], json.dumps(results),
+                ),
+            )
+            if cursor.rowcount == 0:
+                return None
+
+            has_political = row["political_label"] is not None
+            has_toxicity = row["toxicity_max"] is not None
+            self._connection.execute(
+                """
+                INSERT INTO daily_rollups (
+                    day, source, model_version, analyses, political_n,
+                    political_left_sum, political_center_sum, political_right_sum,
+                    toxicity_n, toxicity_max_sum, toxicity_max_max
+                ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (day, source, model_version) DO UPDATE SET
+                    analyses = analyses + 1,
+                    political_n = political_n + excluded.political_n,
+                    political_left_sum = political_left_sum + excluded.political_left_sum,
+                    political_center_sum = political_center_sum + excluded.political_center_sum,
+                    political_right_sum = political_right_sum + excluded.political_right_sum,
+                    toxicity_n = toxicity_n + excluded.toxicity_n,
+                    toxicity_max_sum = toxicity_max_sum + excluded.toxicity_max_sum,
+                    toxicity_max_max = MAX(toxicity_max_max, excluded.toxicity_max_max)
+                """,
+                (
+                    day, source, model_version, int(has_political),
+                    row["political_left"] or 0.0, row["political_center"] or 0.0,
+                    row["political_right"] or 0.0, int(has_toxicity),
+                    row["toxicity_max"] or 0.0, row["toxicity_max"] or 0.0,
+                ),
+            )
+
+            for model, label in (
+                ("political", row["political_label"]),
+                ("sentiment", row["sentiment_label"]),
+                ("toxicity", row["toxicity_label"]),
+            ):
+                if label is None:
+                    continue
+                self._connection.execute(
+                    """
+                    INSERT INTO label_rollups (day, source, model_version, model, label, count)
+                    VALUES (?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (day, source, model_version, model, label)
+                    DO UPDATE SET count = count + 1
+                    """,
+                    (day, source, model_version, model, label),
+                )
+
+            return cursor.lastrowid
+
+    @staticmethod
+    def _filters(source: str = None, start: str = None, end: str = None, model_version: str = None):
+        """
+        SQL WHERE clause and parameters for the common filters.
+
+        `start` / `end` are inclusive ``YYYY-MM-DD`` days (UTC).
+        """
+        clauses, params = [], []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if start:
+            clauses.append("day >= ?")
+            params.append(start[:10])
+        if end:
+            clauses.append("day <= ?")
+            params.append(end[:10])
+        if model_version:
+            clauses.append("model_version = ?")
+            params.append(model_version)
+
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(self, source: str = None, start: str = None, end: str = None,
+              model_version: str = None, text_hash: str = None, limit: int = 100, offset: int = 0):
+        """
+        List stored analyses matching the filters, newest first (by day,
+        then time of insertion).
+
+        Returns:
+            list[dict]: Stored rows with ``metadata`` and ``results`` decoded.
+        """
+        where, params = self._filters(source, start, end, model_version)
+        if text_hash:
+            where = (where + " AND " if where else "WHERE ") + "text_hash = ?"
+            params.append(text_hash)
+
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM analyses {where} ORDER BY day DESC, created_at DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)],
+            ).fetchall()
+
+        analyses = []
+        for row in rows:
+            item = dict(row)
+            item["metadata"] = json.loads(item["metadata"]) if item["metadata"] else None
+            item["results"] = json.loads(item["results"])
+            analyses.append(item)
+        return analyses
+
+    def summary(self, source: str = None, start: str = None, end: str = None,
+                model_version: str = None, group_by: str = None):
+        """
+        Aggregate stored analyses from the precomputed rollups.
+
+        Args:
+            source, start, end, model_version: Filters (as in `query`).
+            group_by (str, optional): ``"day"``, ``"source"``,
+                ``"model_version"`` or None for a single overall group.
+
+        Returns:
+            list[dict]: One entry per group with the analysis count,
+            political label distribution and mean Left/Center/Right
+            scores, emotion and toxicity label counts, and mean/max
+            toxicity.
+        """
+        if group_by not in (None, "day", "source", "model_version"):
+            raise ValueError("group_by must be one of: day, source, model_version")
+
+        where, params = self._filters(source, start, end, model_version)
+        group_column = group_by or "'all'"
+
+        with self._lock:
+            totals = self._connection.execute(
+                f"""
+                SELECT {group_column} AS grp,
+                       SUM(analyses) AS analyses,
+                       SUM(political_n) AS political_n,
+                       SUM(political_left_sum) AS left_sum,
+                       SUM(political_center_sum) AS center_sum,
+                       SUM(political_right_sum) AS right_sum,
+                       SUM(toxicity_n) AS toxicity_n,
+                       SUM(toxicity_max_sum) AS toxicity_sum,
+                       MAX(toxicity_max_max) AS toxicity_max
+                FROM daily_rollups {where}
+                GROUP BY grp ORDER BY grp
+                """,
+                params,
+            ).fetchall()
+
+            labels = self._connection.execute(
+                f"""
+                SELECT {group_column} AS grp, model, label, SUM(count) AS count
+                FROM label_rollups {where}
+                GROUP BY grp, model, label
+                """,
+                params,
+            ).fetchall()
+
+        groups = {}
+        for row in totals:
+            political_n = row["political_n"] or 0
+            toxicity_n = row["toxicity_n"] or 0
+            groups[row["grp"]] = {
+                "group": row["grp"],
+                "analyses": row["analyses"],
+                "political": {
+                    "count": political_n,
+                    "labels": {},
+                    "mean_scores": {
+                        "Left": row["left_sum"] / political_n,
+                        "Center": row["center_sum"] / political_n,
+                        "Right": row["right_sum"] / political_n,
+                    } if political_n else None,
+                },
+                "sentiment": {"labels": {}},
+                "toxicity": {
+                    "count": toxicity_n,
+                    "labels": {},
+                    "mean_max": row["toxicity_sum"] / toxicity_n if toxicity_n else None,
+                    "max": row["toxicity_max"] if toxicity_n else None,
+                },
+            }
+
+        for row in labels:
+            if row["grp"] in groups:
+                groups[row["grp"]][row["model"]]["labels"][row["label"]] = row["count"]
+
+        return list(groups.values())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Shared `ResultStore` at ``BIAS_CHECKER_RESULT_DB`` (opened on first use).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(os.environ.get(RESULT_DB_ENV, "results.db"))
+        return _store
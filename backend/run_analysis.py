@@ -27,9 +27,20 @@ from transformers import (
     AutoTokenizer, 
     DistilBertForSequenceClassification, 
 )  
+from transformers_interpret import SequenceClassificationExplainer
 from detoxify import Detoxify
+from model_bundle import open_bundle
+from model_sources import MODEL_SOURCES, TOXICITY_MODEL_TYPE
+from thread_budget import apply_worker_budget, model_threads
+from fake_models import load_fake_config, build_fake_models
+from profiling import stage, instrument_pipeline, instrument_module
+from collections import OrderedDict
 import torch
 import numpy as np 
+import hashlib
+import json
+import re
+import threading
 import sys
 import os 
 
@@ -44,8 +55,43 @@ toxicity_model = None
 larger_political_model = None
 flan_summarizer = None
 
-
-def load_models():
+# Identifies the loaded model set in stored results (set by load_models)
+model_version = None
+
+# Map HuggingFace label IDs of the political model to readable names
+POLITICAL_LABEL_MAP = {
+    "LABEL_0": "Left",
+    "LABEL_1": "Center",
+    "LABEL_2": "Right",
+}
+
+# Token attribution (explanation) settings
+EXPLAIN_N_STEPS = 20              # integrated-gradients steps per explanation
+EXPLAIN_MAX_N_STEPS = 100         # upper bound for client-requested steps
+EXPLAIN_BATCH_SIZE = 10           # steps evaluated per batched forward pass
+EXPLAIN_MAX_TOKENS = 256          # inputs are truncated to this many tokens
+EXPLAIN_CACHE_SIZE = 512          # cached attributions (LRU, keyed by text hash)
+
+# Toxic span localization settings
+TOXIC_SPAN_THRESHOLD = 0.5        # minimum category score to report a sentence
+TOXIC_SPAN_BATCH_SIZE = 32        # sentences per Detoxify forward pass
+
+# Sentence boundary: whitespace after a terminator (optionally followed by a
+# closing quote/bracket), or a line break. Decimals such as "3.5" never match.
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+|\s*\n\s*")
+SENTENCE_LAST_WORD = re.compile(r"\S+$")
+# Words whose trailing period does not end a sentence (single initials are also kept)
+ABBREVIATIONS = {
+    "dr", "mr", "mrs", "ms", "prof", "st", "jr", "sr", "vs", "gen", "gov",
+    "sen", "rep", "inc", "corp", "ltd", "co", "mt", "e.g", "i.e", "u.s", "u.k",
+}
+
+_explainers = {}
+_explanation_cache = OrderedDict()
+_explain_lock = threading.Lock()
+
+
+def load_models(bundle_dir: str = None):
     """
     Load and initialize all NLP models used by the application.
 
@@ -53,58 +99,127 @@ def load_models():
     are used. It initializes multiple transformer pipelines and
     third-party models and assigns them to global variables.
 
+    If a model bundle is configured (``bundle_dir`` or the
+    ``BIAS_CHECKER_MODEL_BUNDLE`` environment variable, see
+    `model_bundle.py`), models are loaded offline from the bundle and
+    their safetensors weights are memory-mapped instead of downloaded.
+    If ``BIAS_CHECKER_FAKE_MODELS`` is set, lightweight stand-ins from
+    `fake_models.py` are installed instead (for load tests).
+
     Loaded Models:
         - Emotion classifier (BERT-based)
         - Political bias classifier (DeBERTa-based)
         - Toxicity classifier (Detoxify)
         - FLAN-T5 text generation model for summarization
 
+    Args:
+        bundle_dir (str, optional): Directory created by
+            ``python model_bundle.py build``.
+
     Side Effects:
         - Populates global model variables
         - Uses significant memory and startup time
     """
 
     global emotion_classifier, summarizer, bias_model, bias_tokenizer, toxicity_model, larger_political_model, flan_summarizer
+    global model_version
 
     # debugging stmt
     print("\n ==== Loading models (this may take a moment)... ==== \n")
 
+    # Per-worker thread counts / core affinity (BIAS_CHECKER_THREAD_CONFIG)
+    apply_worker_budget()
+
+    # Stand-in models for serving-layer load tests (BIAS_CHECKER_FAKE_MODELS)
+    fake_config = load_fake_config()
+    if fake_config is not None:
+        fakes = build_fake_models(fake_config)
+        emotion_classifier = fakes["emotion_classifier"]
+        larger_political_model = fakes["larger_political_model"]
+        toxicity_model = fakes["toxicity_model"]
+        summarizer = fakes["summarizer"]
+        model_version = "fake"
+        print(" ==== Fake models loaded (load-test mode) ==== \n")
+        return
+
+    bundle = open_bundle(bundle_dir)
+    if bundle is not None:
+        print(f" ==== Using offline model bundle: {bundle.bundle_dir} ==== \n")
+
+        def source(key):
+            return bundle.path(key)
+
+        model_kwargs = {"use_safetensors": True, "low_cpu_mem_usage": True}
+    else:
+        def source(key):
+            return MODEL_SOURCES[key]
+
+        model_kwargs = {}
+
     # Emotion classifier
-    emotion_model_name = "bhadresh-savani/bert-base-uncased-emotion"
     emotion_classifier = pipeline(
         "text-classification",
-        model=emotion_model_name,
-        tokenizer=emotion_model_name
+        model=source("emotion"),
+        tokenizer=source("emotion"),
+        model_kwargs=model_kwargs,
     )
 
     # Summarizer
-    summarizer_name = "facebook/bart-large-cnn"
     summarizer = pipeline(
         "summarization",
-        model=summarizer_name,
-        tokenizer=summarizer_name
+        model=source("summarizer"),
+        tokenizer=source("summarizer"),
+        model_kwargs=model_kwargs,
     )
 
     # Larger political bias model (from larger_nlp_testing.py)
     larger_political_model = pipeline(
         "text-classification",
-        model="matous-volf/political-leaning-deberta-large",
-        tokenizer="microsoft/deberta-v3-large",
+        model=source("political"),
+        tokenizer=source("political_tokenizer"),
+        model_kwargs=model_kwargs,
     )
     
     # Toxicity model
-    toxicity_model = Detoxify('unbiased')
+    if bundle is not None:
+        toxicity_model = bundle.load_detoxify()
+    else:
+        toxicity_model = Detoxify(TOXICITY_MODEL_TYPE)
 
     # Flan model for summarization (optional)
-    model_name = "google/flan-t5-large"
-
     summarizer = pipeline(
         "text2text-generation",
-        model=model_name,
+        model=source("flan"),
         max_length=256,
-        truncation=True
+        truncation=True,
+        model_kwargs=model_kwargs,
     )
 
+    if bundle is not None:
+        # Pinned revisions identify the exact weights
+        revisions = bundle.revisions()
+        prefix = "bundle"
+    else:
+        # Commits the hub resolved at load time (change when weights are updated)
+        revisions = {
+            key: getattr(pipe.model.config, "_commit_hash", None) or "unknown"
+            for key, pipe in (
+                ("emotion", emotion_classifier),
+                ("political", larger_political_model),
+                ("flan", summarizer),
+            )
+        }
+        revisions["toxicity"] = TOXICITY_MODEL_TYPE
+        prefix = "hub"
+    model_version = prefix + ":" + hashlib.sha256(
+        json.dumps(revisions, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+
+    # Per-stage timings (tokenize / forward / generate) for request traces
+    instrument_pipeline(emotion_classifier, "emotion")
+    instrument_pipeline(larger_political_model, "political")
+    instrument_pipeline(summarizer, "flan")
+    instrument_module(toxicity_model.model, "toxicity")
 
     print(" ==== Models loaded successfully! ==== \n")
     
@@ -139,30 +254,38 @@ def run_sentiment_model(text: str, sensitivity: str):
                 raise RuntimeError("Emotion model not loaded")
 
             # Request full distribution
-            outputs = emotion_classifier(text, return_all_scores=True)[0]
-
-            # Convert everything to float and clean format
-            all_scores = [
-                {
-                    "label": item["label"],
-                    "score": float(item["score"])
-                }
-                for item in outputs
-            ]
-
-            # Find best emotion (highest score)
-            best_emotion = max(all_scores, key=lambda x: x["score"])
-
-            return {
-                "top": best_emotion,
-                "all_scores": all_scores
-            }
+            with model_threads("emotion"), stage("emotion"):
+                outputs = emotion_classifier(text, return_all_scores=True)[0]
+
+            return _format_emotion_output(outputs)
 
     except Exception as e:
         print(f"Emotion model error: {e}")
         return None
 
 
+def _format_emotion_output(outputs: list):
+    """
+    Convert raw emotion pipeline scores into the API response shape.
+    """
+    # Convert everything to float and clean format
+    all_scores = [
+        {
+            "label": item["label"],
+            "score": float(item["score"])
+        }
+        for item in outputs
+    ]
+
+    # Find best emotion (highest score)
+    best_emotion = max(all_scores, key=lambda x: x["score"])
+
+    return {
+        "top": best_emotion,
+        "all_scores": all_scores
+    }
+
+
 def run_political_model(text: str, sensitivity: str):
     """
     Analyze political leaning of the input text.
@@ -183,31 +306,30 @@ def run_political_model(text: str, sensitivity: str):
             raise RuntimeError("Political model not loaded")
 
         # Request ALL scores
-        outputs = larger_political_model(text, return_all_scores=True)[0]
-
-        # Map HuggingFace label IDs to readable names
-        label_map = {
-            "LABEL_0": "Left",
-            "LABEL_1": "Center",
-            "LABEL_2": "Right",
-        }
+        with model_threads("political"), stage("political"):
+            outputs = larger_political_model(text, return_all_scores=True)[0]
 
-        # Convert each output dict
-        results = [
-            {
-                "label": label_map.get(item["label"], item["label"]),
-                "score": float(item["score"])
-            }
-            for item in outputs
-        ]
-
-        return results
+        return _format_political_output(outputs)
 
     except Exception as e:
         print(f"Political bias model error: {e}")
         return None
 
 
+def _format_political_output(outputs: list):
+    """
+    Convert raw political pipeline scores into readable labels and floats.
+    """
+    # Convert each output dict
+    return [
+        {
+            "label": POLITICAL_LABEL_MAP.get(item["label"], item["label"]),
+            "score": float(item["score"])
+        }
+        for item in outputs
+    ]
+
+
 # Toxicity model function here but might split this into different categories for different toxicity types (e.g. toxicity, severe toxicity, identity attack, etc.)
 def run_toxicity_model(text: str, sensitivity: str):
     """
@@ -228,22 +350,14 @@ def run_toxicity_model(text: str, sensitivity: str):
         if not isinstance(text, str):
             text = str(text)
 
-        results = toxicity_model.predict(text)
+        with model_threads("toxicity"), stage("toxicity"):
+            results = toxicity_model.predict(text)
 
         clean_results = {}
 
         for key, value in results.items():
-            original_key = key
-
-            # Special-case rename BEFORE formatting
-            if original_key == "sexual_explicit":
-                original_key = "sexually_explicit"
-
-            # Format labels: "identity_attack" → "Identity Attack"
-            formatted_key = original_key.replace("_", " ").title()
-
             # Convert numpy.float32 → float
-            clean_results[formatted_key] = float(value)
+            clean_results[_format_toxicity_label(key)] = float(value)
 
         return clean_results
 
@@ -252,6 +366,130 @@ def run_toxicity_model(text: str, sensitivity: str):
         return {"error": str(e)}
 
 
+def _format_toxicity_label(key: str):
+    """
+    Format a Detoxify category key for frontend readability.
+
+    Example: "identity_attack" → "Identity Attack".
+    """
+    # Special-case rename BEFORE formatting
+    if key == "sexual_explicit":
+        key = "sexually_explicit"
+
+    return key.replace("_", " ").title()
+
+
+def _split_sentences(text: str):
+    """
+    Split text into sentences, keeping character offsets.
+
+    Sentences end at '.', '!' or '?' (plus any closing quotes/brackets)
+    followed by whitespace or the end of the text, or at a line break.
+    Periods inside numbers ("3.5") and after common abbreviations or
+    initials ("Dr.", "J.") do not end a sentence. Whitespace-only
+    pieces are skipped.
+
+    Returns:
+        list[tuple[int, int]]: (start, end) offsets into `text`.
+    """
+    pieces = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if "\n" not in match.group():
+            last = SENTENCE_LAST_WORD.search(text, max(start, match.start() - 20), match.start())
+            word = last.group() if last else ""
+            core = word.strip("\"')]([").rstrip(".").lower()
+            if word.rstrip("\"')]").endswith(".") and (
+                core in ABBREVIATIONS or (len(core) == 1 and core.isalpha())
+            ):
+                continue
+        pieces.append((start, match.start()))
+        start = match.end()
+    pieces.append((start, len(text)))
+
+    spans = []
+    for start, end in pieces:
+        piece = text[start:end]
+
+        # Trim surrounding whitespace from the offsets
+        start += len(piece) - len(piece.lstrip())
+        end -= len(piece) - len(piece.rstrip())
+        if end > start:
+            spans.append((start, end))
+
+    return spans
+
+
+def run_toxicity_span_model(text: str, sensitivity: str, threshold: float = TOXIC_SPAN_THRESHOLD):
+    """
+    Localize toxic language to individual sentences.
+
+    The text is split into sentences which are scored by Detoxify in
+    batched `predict` calls of `TOXIC_SPAN_BATCH_SIZE` sentences (rather
+    than one call per sentence, or one huge padded batch for long texts).
+    Sentences whose highest category score reaches `threshold` are
+    returned as spans with their offsets, so moderators can jump
+    straight to the problem.
+
+    Args:
+        text (str): Input text to analyze.
+        sensitivity (str): Reserved for future tuning (currently unused).
+        threshold (float): Minimum category score for a sentence to be
+            reported as a toxic span.
+
+    Returns:
+        dict: Dictionary containing:
+            - document (dict): Per-category maximum over all sentences
+            - spans (list[dict]): Offending sentences with start/end
+              offsets, text, per-category scores and top category
+
+        Includes error information if analysis fails.
+    """
+    try:
+        if not isinstance(text, str):
+            text = str(text)
+
+        offsets = _split_sentences(text)
+        if not offsets:
+            return {"document": {}, "spans": []}
+
+        sentences = [text[start:end] for start, end in offsets]
+
+        # Batched calls: Detoxify returns {category: [score per sentence]}
+        results = {}
+        for chunk_start in range(0, len(sentences), TOXIC_SPAN_BATCH_SIZE):
+            chunk = sentences[chunk_start:chunk_start + TOXIC_SPAN_BATCH_SIZE]
+            with model_threads("toxicity"), stage("toxicity"):
+                scores = toxicity_model.predict(chunk)
+            for key, values in scores.items():
+                results.setdefault(key, []).extend(values)
+
+        labels = {key: _format_toxicity_label(key) for key in results}
+        document = {
+            labels[key]: float(max(values)) for key, values in results.items()
+        }
+
+        spans = []
+        for i, (start, end) in enumerate(offsets):
+            scores = {labels[key]: float(values[i]) for key, values in results.items()}
+            top_label, top_score = max(scores.items(), key=lambda x: x[1])
+
+            if top_score >= threshold:
+                spans.append({
+                    "start": start,
+                    "end": end,
+                    "text": sentences[i],
+                    "scores": scores,
+                    "top": {"label": top_label, "score": top_score},
+                })
+
+        return {"document": document, "spans": spans}
+
+    except Exception as e:
+        print("Toxicity span model error:", e)
+        return {"error": str(e)}
+
+
     
 def run_summarization_model(text: str, sensitivity: str):
     """
@@ -354,7 +592,8 @@ def run_flan_summarization_model(text: str, results: dict):
     print("FLAN prompt:\n", prompt)
 
     try:
-        summary = summarizer(prompt)[0]["generated_text"]
+        with model_threads("flan"), stage("flan"):
+            summary = summarizer(prompt)[0]["generated_text"]
         return summary
     except Exception as e:
         print("FLAN summarization error:", e)
@@ -363,6 +602,242 @@ def run_flan_summarization_model(text: str, results: dict):
 
 
 
+# ===============================================
+#   EXPLANATION FUNCTIONS
+#
+# Token attributions (integrated gradients via
+# transformers_interpret) for the classifier models.
+# Attribution steps are evaluated in batches, inputs
+# are length-capped and results are cached by text hash.
+# ===============================================
+
+def _get_explainer(model: str):
+    """
+    Return (and lazily create) the attribution explainer for a model.
+
+    The explainer reuses the model and tokenizer already held by the
+    loaded pipeline, so no extra weights are loaded.
+
+    Args:
+        model (str): Either "emotion" or "political".
+
+    Returns:
+        SequenceClassificationExplainer: Explainer bound to the model.
+    """
+    if model in _explainers:
+        return _explainers[model]
+
+    if model == "emotion":
+        if emotion_classifier is None:
+            raise RuntimeError("Emotion model not loaded")
+        explainer = SequenceClassificationExplainer(
+            emotion_classifier.model,
+            emotion_classifier.tokenizer,
+        )
+    elif model == "political":
+        if larger_political_model is None:
+            raise RuntimeError("Political model not loaded")
+        config = larger_political_model.model.config
+        labels = [
+            POLITICAL_LABEL_MAP.get(config.id2label[i], config.id2label[i])
+            for i in range(config.num_labels)
+        ]
+        explainer = SequenceClassificationExplainer(
+            larger_political_model.model,
+            larger_political_model.tokenizer,
+            custom_labels=labels,
+        )
+    else:
+        raise ValueError(f"Unknown model for explanation: {model}")
+
+    _explainers[model] = explainer
+    return explainer
+
+
+def _truncate_to_tokens(text: str, tokenizer, max_tokens: int):
+    """
+    Cut text down so that it tokenizes to at most `max_tokens` tokens.
+
+    Uses offset mappings (fast tokenizers) so the original casing and
+    spacing are preserved; falls back to decoding the kept tokens.
+
+    Returns:
+        str: The (possibly) shortened text.
+    """
+    # Leave room for the [CLS]/[SEP] style special tokens
+    limit = max(1, max_tokens - 2)
+
+    if getattr(tokenizer, "is_fast", False):
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoded["offset_mapping"]
+        if len(offsets) <= limit:
+            return text
+        return text[:offsets[limit - 1][1]]
+
+    token_ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(token_ids) <= limit:
+        return text
+    return tokenizer.decode(token_ids[:limit], skip_special_tokens=True)
+
+
+def run_explanation_model(text: str, model: str, n_steps: int = None):
+    """
+    Compute per-token attributions explaining a classifier's prediction.
+
+    Integrated gradients needs one forward/backward pass per step; these
+    are evaluated `EXPLAIN_BATCH_SIZE` steps at a time instead of one by
+    one. Inputs are capped at `EXPLAIN_MAX_TOKENS` tokens and results are
+    cached (LRU) by a hash of the model, step count and text.
+
+    Args:
+        text (str): Input text to explain.
+        model (str): Which classifier to explain ("emotion" or "political").
+        n_steps (int, optional): Number of attribution steps. Defaults to
+            `EXPLAIN_N_STEPS`; clamped to `EXPLAIN_MAX_N_STEPS`.
+
+    Returns:
+        dict: Dictionary containing:
+            - label (str): Predicted label that is being explained
+            - score (float): Model probability for that label
+            - attributions (list[dict]): Token and attribution score pairs
+            - truncated (bool): Whether the input was shortened
+
+        Returns None if the model is unavailable or an error occurs.
+    """
+    try:
+        if not isinstance(text, str):
+            text = str(text)
+
+        steps = int(n_steps) if n_steps else EXPLAIN_N_STEPS
+        steps = max(1, min(steps, EXPLAIN_MAX_N_STEPS))
+
+        key = hashlib.sha256(f"{model}:{steps}:{text}".encode("utf-8")).hexdigest()
+
+        with _explain_lock:
+            if key in _explanation_cache:
+                _explanation_cache.move_to_end(key)
+                return _explanation_cache[key]
+
+            explainer = _get_explainer(model)
+            capped = _truncate_to_tokens(text, explainer.tokenizer, EXPLAIN_MAX_TOKENS)
+
+            with model_threads(model), stage(f"{model}.explain"):
+                word_attributions = explainer(
+                    capped,
+                    internal_batch_size=min(EXPLAIN_BATCH_SIZE, steps),
+                    n_steps=steps,
+                )
+
+            result = {
+                "label": explainer.predicted_class_name,
+                "score": float(explainer.pred_probs),
+                "attributions": [
+                    {"token": token, "score": float(score)}
+                    for token, score in word_attributions
+                ],
+                "truncated": capped != text,
+            }
+
+            _explanation_cache[key] = result
+            if len(_explanation_cache) > EXPLAIN_CACHE_SIZE:
+                _explanation_cache.popitem(last=False)
+
+        return result
+
+    except Exception as e:
+        print(f"Explanation model error: {e}")
+        return None
+
+
+
+
+# ===============================================
+#   BATCHED ANALYSIS
+#
+# Used by the bulk CLI: each model processes a whole
+# list of documents with batched pipeline calls and
+# returns the same per-document shapes as the
+# individual model functions above.
+# ===============================================
+
+def run_batch_analysis(texts: list, selected: dict, batch_size: int = 16):
+    """
+    Analyze many documents with batched model calls.
+
+    Args:
+        texts (list[str]): Documents to analyze.
+        selected (dict): Which analyses to run, as in `/api/analyze`
+            (sentiment, political, toxicity, toxicity_spans, summary).
+        batch_size (int): Documents per forward pass.
+
+    Returns:
+        list[dict]: Per-document results, in input order. A model that
+        fails for a batch yields None (or an error dict for toxicity)
+        for those documents, matching the single-text functions.
+    """
+    texts = [text if isinstance(text, str) else str(text) for text in texts]
+    results = [{} for _ in texts]
+
+    if selected.get("sentiment"):
+        try:
+            with model_threads("emotion"), stage("emotion"):
+                outputs = emotion_classifier(
+                    texts, return_all_scores=True, truncation=True, batch_size=batch_size
+                )
+            for result, output in zip(results, outputs):
+                result["sentiment"] = _format_emotion_output(output)
+        except Exception as e:
+            print(f"Emotion model error: {e}")
+            for result in results:
+                result["sentiment"] = None
+
+    if selected.get("political"):
+        try:
+            with model_threads("political"), stage("political"):
+                outputs = larger_political_model(
+                    texts, return_all_scores=True, truncation=True, batch_size=batch_size
+                )
+            for result, output in zip(results, outputs):
+                result["political"] = _format_political_output(output)
+        except Exception as e:
+            print(f"Political bias model error: {e}")
+            for result in results:
+                result["political"] = None
+
+    if selected.get("toxicity"):
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            try:
+                with model_threads("toxicity"), stage("toxicity"):
+                    scores = toxicity_model.predict(chunk)
+                for i in range(len(chunk)):
+                    results[start + i]["toxicity"] = {
+                        _format_toxicity_label(key): float(values[i])
+                        for key, values in scores.items()
+                    }
+            except Exception as e:
+                print("Toxicity model error:", e)
+                for i in range(len(chunk)):
+                    results[start + i]["toxicity"] = {"error": str(e)}
+
+    if selected.get("toxicity_spans"):
+        for result, text in zip(results, texts):
+            result["toxicity_spans"] = run_toxicity_span_model(text, "")
+
+    if selected.get("summary"):
+        for result, text in zip(results, texts):
+            # Failed analyses (None, or a toxicity error dict) are left out
+            completed = {
+                key: value for key, value in result.items()
+                if value is not None and not (isinstance(value, dict) and "error" in value)
+            }
+            result["summary"] = run_flan_summarization_model(text, completed)
+
+    return results
+
+
+
+
 # ===============================================
 #   ANALYSIS FUNCTION   |    Authors: Dominik T.
 # ===============================================
@@ -440,57 +915,127 @@ def analyze_text(text: str):
 # ==============================================
 #  MAIN EXECUTION LOGIC    |   Author: Amara B
 # ==============================================
+def _init_worker(bundle_dir: str):
+    """
+    Pool initializer: load the models once per worker process.
+    """
+    load_models(bundle_dir)
+
+
+def _analyze_batch(batch: list, selected: dict, batch_size: int):
+    """
+    Analyze one batch of documents and attach their ids.
+
+    Args:
+        batch (list[dict]): Documents as yielded by `bulk_io.iter_documents`.
+        selected (dict): Which analyses to run.
+        batch_size (int): Documents per forward pass.
+
+    Returns:
+        list[dict]: ``{"id": ..., **results}`` per document, in order.
+        Unreadable documents keep their ``{"id": ..., "error": ...}`` record.
+    """
+    readable = [doc for doc in batch if "error" not in doc]
+    results = iter(
+        run_batch_analysis([doc["text"] for doc in readable], selected, batch_size) if readable else []
+    )
+    return [doc if "error" in doc else {"id": doc["id"], **next(results)} for doc in batch]
+
+
 def main():
     """
-    Command-line interface entry point for the Bias Checker system.
+    Command-line interface entry point for bulk analysis.
 
-    Allows developers to run NLP analysis directly from the terminal
-    for testing or debugging purposes.
+    Streams documents from JSONL files, text files, PDFs or directories,
+    analyzes them in batches (optionally in a pool of worker processes,
+    each with its own copy of the models) and appends results in input
+    order to a JSONL file or Parquet directory. Progress is checkpointed
+    after every batch, so re-running the same command after a crash
+    resumes where it left off.
 
     Intended Usage:
-        $ python run_analysis.py
-
-    Note:
-        CLI execution is currently disabled/commented out, as the
-        primary usage is via the FastAPI backend.
-    """
-
-    # Handle CLI input (file or manual)
-    # if len(sys.argv) > 1:
-    #     file_path = sys.argv[1]
-    #     if os.path.exists(file_path):
-    #         with open(file_path, "r", encoding="utf-8") as f:
-    #             text = f.read()
-    #     else:
-    #         print(f"❌ File not found: {file_path}")
-    #         sys.exit(1)
-    # else:
-    #     print("Enter text to analyze (press Enter when done):\n")
-    #     text = input("> ")
-
-    # print("\n🔍 Running analysis...\n")
-    # result = analyze_text(text)
-
-    # # ======================
-    # #  Display Results
-    # # ======================
-    # print("🧠 Primary Emotion:", result["emotion"]["label"])
-    # print(f"   Confidence: {result['emotion']['score']:.3f}")
-
-    # print("\n📰 Summary:")
-    # print(result["summary"])
-
-    # print("\n🏛️ Political Bias Scores:")
-    # if result["political_bias"]:
-    #     for k, v in result["political_bias"].items():
-    #         print(f"  - {k}: {v:.3f}")
-    # else:
-    #     print("  (No bias detected or model error.)")
-
-    # print("\n☣️ Toxicity Score:")
-    # print(result["toxicity"])
+        $ python run_analysis.py articles.jsonl -o results.jsonl
+        $ python run_analysis.py ./pdfs notes.txt -o results.parquet --workers 4
+        $ python run_analysis.py articles.jsonl -o results.jsonl --models political toxicity --summary
+    """
+    import argparse
+    import functools
+    import multiprocessing
+    import time
+
+    from collections import deque
+
+    from bulk_io import ResultWriter, iter_batches, iter_documents
+
+    parser = argparse.ArgumentParser(description="Bias Checker bulk analysis.")
+    parser.add_argument("inputs", nargs="+", help=".jsonl/.txt/.pdf files or directories.")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output .jsonl file or .parquet directory.")
+    parser.add_argument("--models", nargs="+", default=["sentiment", "political", "toxicity"],
+                        choices=["sentiment", "political", "toxicity", "toxicity_spans"])
+    parser.add_argument("--summary", action="store_true", help="Also generate FLAN summaries.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (each loads all models).")
+    parser.add_argument("--batch-size", type=int, default=16, help="Documents per forward pass.")
+    parser.add_argument("--text-field", default="text", help="JSONL key holding the text.")
+    parser.add_argument("--id-field", default="id", help="JSONL key holding the document id.")
+    parser.add_argument("--bundle", help="Offline model bundle directory (see model_bundle.py).")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over.")
+    args = parser.parse_args()
+
+    selected = {model: True for model in args.models}
+    selected["summary"] = args.summary
+
+    run_config = {
+        "inputs": [os.path.abspath(path) for path in args.inputs],
+        "selected": selected,
+        "text_field": args.text_field,
+        "id_field": args.id_field,
+    }
+    try:
+        writer = ResultWriter(args.output, run_config, restart=args.restart)
+    except ValueError as e:
+        parser.error(str(e))
+    if writer.documents_done:
+        print(f"Resuming after {writer.documents_done} completed documents.")
+
+    documents = iter_documents(
+        args.inputs, args.text_field, args.id_field, skip=writer.documents_done
+    )
+    batches = iter_batches(documents, args.batch_size)
+    analyze = functools.partial(_analyze_batch, selected=selected, batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    processed = 0
+
+    def write(records):
+        nonlocal processed
+        writer.write_batch(records)
+        processed += len(records)
+        print(f"  {writer.documents_done} documents done "
+              f"({processed / (time.perf_counter() - start):.2f} docs/s)")
+
+    if args.workers > 1:
+        # "spawn" avoids forking a process whose torch thread pools are already running
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.workers, initializer=_init_worker, initargs=(args.bundle,)) as pool:
+            # Bounded window of in-flight batches: keeps memory flat on huge
+            # inputs (Pool.imap would read the whole stream ahead) and lets
+            # results be written/checkpointed strictly in input order.
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.apply_async(analyze, (batch,)))
+                if len(pending) >= 2 * args.workers:
+                    write(pending.popleft().get())
+            while pending:
+                write(pending.popleft().get())
+    else:
+        load_models(args.bundle)
+        for batch in batches:
+            write(analyze(batch))
+
+    print(f"\n ==== Finished: {writer.documents_done} documents written to {args.output} ==== \n")
 
     
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,254 @@
+"""
+scheduler.py
+------------
+Priority scheduling of model inference for the Bias Checker API.
+
+All model work submitted by the API goes through one `InferenceScheduler`
+instead of running directly on the event loop. Work is served:
+
+- By priority class: queued ``interactive`` work always runs before
+  ``bulk`` work, so dashboard users never wait behind a nightly batch
+- Fairly within a class: clients are served round-robin, one job each,
+  so a single heavy client cannot starve the others
+
+The class is chosen per request (``"priority"`` field / ``X-Priority``
+header) or pinned per API key via ``BIAS_CHECKER_API_KEY_PRIORITIES``
+(e.g. ``"nightly-key=bulk,dashboard-key=interactive"``). A key pinned
+to ``bulk`` cannot raise its own priority; any request may lower it.
+
+Fair sharing identifies a client by its API key only if the key is one
+of the configured keys; anything else is identified by its address, so
+a client cannot get extra turns by sending a new key with each request.
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from collections import OrderedDict, deque
+import asyncio
+import contextvars
+import os
+import threading
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Served strictly in this order
+PRIORITY_CLASSES = (INTERACTIVE, BULK)
+
+API_KEY_PRIORITIES_ENV = "BIAS_CHECKER_API_KEY_PRIORITIES"
+SCHEDULER_WORKERS_ENV = "BIAS_CHECKER_SCHEDULER_WORKERS"
+
+
+def _parse_key_priorities(value: str):
+    """
+    Parse ``"key1=bulk,key2=interactive"`` into a dict.
+    """
+    priorities = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        key, priority = item.split("=", 1)
+        if priority.strip() in PRIORITY_CLASSES:
+            priorities[key.strip()] = priority.strip()
+    return priorities
+
+
+API_KEY_PRIORITIES = _parse_key_priorities(os.environ.get(API_KEY_PRIORITIES_ENV))
+
+
+def resolve_priority(requested: str = None, api_key: str = None):
+    """
+    Decide the priority class of a request.
+
+    Args:
+        requested (str, optional): Class asked for by the request.
+        api_key (str, optional): Client API key.
+
+    Returns:
+        str: ``"interactive"`` or ``"bulk"``.
+    """
+    pinned = API_KEY_PRIORITIES.get(api_key)
+
+    if requested == BULK:
+        return BULK
+    if pinned is not None:
+        return pinned
+    return INTERACTIVE
+
+
+def client_identity(api_key: str = None, address: str = None):
+    """
+    Identity used for fair sharing within a priority class.
+
+    Args:
+        api_key (str, optional): ``X-API-Key`` header of the request.
+        address (str, optional): Client address.
+
+    Returns:
+        str: ``"key:<key>"`` for a configured API key, else
+        ``"addr:<address>"``.
+    """
+    if api_key is not None and api_key in API_KEY_PRIORITIES:
+        return f"key:{api_key}"
+    return f"addr:{address or 'anonymous'}"
+
+
+class _Job:
+    """
+    One unit of model work and the future awaiting its result.
+    """
+
+    __slots__ = ("fn", "args", "kwargs", "future", "loop", "context")
+
+    def __init__(self, fn, args, kwargs, future, loop):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.loop = loop
+        # Run in the submitting request's context (e.g. its profiling trace)
+        self.context = contextvars.copy_context()
+
+
+class InferenceScheduler:
+    """
+    Run blocking model calls on worker threads in priority/fair order.
+
+    Args:
+        workers (int): Number of threads executing jobs. Models are
+            CPU-bound, so the default of 1 keeps inference serialized
+            (see `thread_budget.py` for sizing threads per job).
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_CLASSES}
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = False
+
+    def start(self):
+        """
+        Start the worker threads (idempotent).
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"inference-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """
+        Stop the worker threads after their current job.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    async def run(self, fn, *args, priority: str = INTERACTIVE, client: str = "anonymous", **kwargs):
+        """
+        Queue `fn(*args, **kwargs)` and wait for its result.
+
+        Args:
+            fn (callable): Blocking function to run on a worker thread.
+            priority (str): ``"interactive"`` or ``"bulk"``.
+            client (str): Client identity used for fair sharing.
+
+        Returns:
+            Any: The return value of `fn`. Exceptions raised by `fn`
+            are re-raised here.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        job = _Job(fn, args, kwargs, future, loop)
+
+        with self._condition:
+            self._queues[priority].setdefault(client, deque()).append(job)
+            self._condition.notify()
+
+        return await future
+
+    def stats(self):
+        """
+        Queued job counts per priority class and client.
+        """
+        with self._condition:
+            return {
+                priority: {client: len(jobs) for client, jobs in clients.items()}
+                for priority, clients in self._queues.items()
+            }
+
+    def _next_job(self):
+        """
+        Pop the next job: highest class first, round-robin over its clients.
+
+        Must be called with the condition held.
+        """
+        for priority in PRIORITY_CLASSES:
+            clients = self._queues[priority]
+            if not clients:
+                continue
+
+            client, jobs = next(iter(clients.items()))
+            job = jobs.popleft()
+
+            # Rotate the client to the back, or drop it when drained
+            del clients[client]
+            if jobs:
+                clients[client] = jobs
+
+            return job
+
+        return None
+
+    def _worker_loop(self):
+        """
+        Execute jobs until the scheduler is stopped.
+        """
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None and self._running:
+                    self._condition.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+
+            # The awaiting request may have been cancelled (client went away)
+            if job.future.cancelled():
+                continue
+
+            try:
+                result = job.context.run(job.fn, *job.args, **job.kwargs)
+            except BaseException as e:
+                job.loop.call_soon_threadsafe(_set_exception, job.future, e)
+            else:
+                job.loop.call_soon_threadsafe(_set_result, job.future, result)
+
+
+def _set_result(future, result):
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _set_exception(future, exception):
+    if not future.cancelled():
+        future.set_exception(exception)
+
+
+# Shared scheduler used by the FastAPI app
+scheduler = InferenceScheduler(int(os.environ.get(SCHEDULER_WORKERS_ENV, "1")))
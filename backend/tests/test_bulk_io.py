@@ -0,0 +1,120 @@
+"""
+Tests for input streaming and checkpointed output in `bulk_io`.
+"""
+
+import json
+import os
+
+import pytest
+
+from bulk_io import ResultWriter, iter_batches, iter_documents
+
+CONFIG = {"inputs": ["articles.jsonl"], "selected": {"toxicity": True}}
+
+
+def _write_jsonl(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_iter_documents_reads_jsonl_and_skips_done(tmp_path):
+    path = str(tmp_path / "in.jsonl")
+    _write_jsonl(path, [
+        json.dumps({"id": "a", "text": "first", "published_at": "2024-03-01"}),
+        "",
+        json.dumps({"text": "second"}),
+        json.dumps({"id": 3, "text": "third"}),
+    ])
+
+    documents = list(iter_documents([path], published_field="published_at"))
+    assert documents == [
+        {"id": "a", "text": "first", "published_at": "2024-03-01"},
+        {"id": f"{path}:3", "text": "second"},
+        {"id": "3", "text": "third"},
+    ]
+    assert list(iter_documents([path], skip=2)) == [{"id": "3", "text": "third"}]
+
+
+def test_iter_documents_yields_error_records_for_unreadable_input(tmp_path):
+    path = str(tmp_path / "in.jsonl")
+    _write_jsonl(path, [json.dumps({"id": "a", "text": "ok"}), "not json", "[1, 2]"])
+    pdf_path = str(tmp_path / "broken.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(b"not a pdf")
+
+    documents = list(iter_documents([path, pdf_path]))
+
+    assert documents[0] == {"id": "a", "text": "ok"}
+    assert [doc["id"] for doc in documents[1:]] == [f"{path}:2", f"{path}:3", pdf_path]
+    assert all("error" in doc and "text" not in doc for doc in documents[1:])
+
+
+def test_iter_documents_rejects_unsupported_input(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_documents([str(tmp_path / "data.csv")]))
+
+
+def test_iter_batches_keeps_remainder():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_writer_resume_truncates_partial_write(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+
+    writer = ResultWriter(output, CONFIG)
+    writer.write_batch([{"id": "1"}, {"id": "2"}])
+
+    # A crash after the checkpoint leaves an unrecorded partial line
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"id": "3", "tox')
+
+    resumed = ResultWriter(output, CONFIG)
+    assert resumed.documents_done == 2
+    assert _read_jsonl(output) == [{"id": "1"}, {"id": "2"}]
+
+    resumed.write_batch([{"id": "3"}])
+    assert _read_jsonl(output) == [{"id": "1"}, {"id": "2"}, {"id": "3"}]
+    assert ResultWriter(output, CONFIG).documents_done == 3
+
+
+def test_writer_refuses_checkpoint_with_other_settings(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    ResultWriter(output, CONFIG).write_batch([{"id": "1"}])
+
+    with pytest.raises(ValueError):
+        ResultWriter(output, {**CONFIG, "selected": {"sentiment": True}})
+
+    restarted = ResultWriter(output, {**CONFIG, "selected": {"sentiment": True}}, restart=True)
+    assert restarted.documents_done == 0
+    assert os.path.getsize(output) == 0
+
+
+def test_writer_does_not_overwrite_output_without_checkpoint(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    _write_jsonl(output, [json.dumps({"id": "earlier run"})])
+
+    with pytest.raises(ValueError):
+        ResultWriter(output, CONFIG)
+    assert _read_jsonl(output) == [{"id": "earlier run"}]
+
+    ResultWriter(output, CONFIG, restart=True).write_batch([{"id": "1"}])
+    assert _read_jsonl(output) == [{"id": "1"}]
+
+
+def test_writer_resume_drops_unrecorded_parquet_parts(tmp_path):
+    pytest.importorskip("pyarrow")
+    output = str(tmp_path / "out.parquet")
+
+    ResultWriter(output, CONFIG).write_batch([{"id": "1", "toxicity": {"Toxicity": 0.1}}])
+    stale = os.path.join(output, "part-00001.parquet")
+    with open(stale, "wb") as f:
+        f.write(b"partial")
+
+    resumed = ResultWriter(output, CONFIG)
+    assert resumed.documents_done == 1
+    assert sorted(os.listdir(output)) == ["part-00000.parquet"]
@@ -0,0 +1,96 @@
+"""
+Tests for storage, deduplication and rollup arithmetic in `result_store`.
+"""
+
+import pytest
+
+from result_store import ResultStore, parse_timestamp, text_hash
+
+
+def _results(left, center, right, toxicity=0.0, emotion="joy"):
+    return {
+        "sentiment": {"top": {"label": emotion, "score": 0.9}, "all_scores": []},
+        "political": [
+            {"label": "Left", "score": left},
+            {"label": "Center", "score": center},
+            {"label": "Right", "score": right},
+        ],
+        "toxicity": {"Toxicity": toxicity, "Insult": toxicity / 2},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / "results.db"))
+
+
+def test_summary_rolls_up_counts_means_and_labels(store):
+    store.save("one", _results(0.6, 0.3, 0.1, toxicity=0.8), "v1", "outlet", published_at="2024-03-01")
+    store.save("two", _results(0.2, 0.2, 0.6, toxicity=0.2, emotion="anger"), "v1", "outlet",
+               published_at="2024-03-02")
+    store.save("three", {"toxicity": {"error": "failed"}}, "v1", "outlet", published_at="2024-03-02")
+
+    [group] = store.summary(source="outlet")
+
+    assert group["analyses"] == 3
+    assert group["political"]["count"] == 2
+    assert group["political"]["labels"] == {"Left": 1, "Right": 1}
+    assert group["political"]["mean_scores"] == pytest.approx({"Left": 0.4, "Center": 0.25, "Right": 0.35})
+    assert group["sentiment"]["labels"] == {"joy": 1, "anger": 1}
+    assert group["toxicity"]["count"] == 2
+    assert group["toxicity"]["labels"] == {"Toxicity": 1, "None": 1}
+    assert group["toxicity"]["mean_max"] == pytest.approx(0.5)
+    assert group["toxicity"]["max"] == pytest.approx(0.8)
+
+
+def test_summary_groups_and_filters_by_day(store):
+    store.save("one", _results(0.6, 0.3, 0.1), "v1", "a", published_at="2024-03-01T23:30:00-02:00")
+    store.save("two", _results(0.1, 0.3, 0.6), "v1", "a", published_at="2024-03-05")
+    store.save("three", _results(0.1, 0.8, 0.1), "v1", "b", published_at="2024-04-01")
+
+    # Published times are converted to UTC days
+    by_day = store.summary(group_by="day")
+    assert [(group["group"], group["analyses"]) for group in by_day] == [
+        ("2024-03-02", 1), ("2024-03-05", 1), ("2024-04-01", 1),
+    ]
+
+    [march] = store.summary(source="a", start="2024-03-01", end="2024-03-31")
+    assert march["analyses"] == 2
+
+    by_source = store.summary(group_by="source")
+    assert {group["group"]: group["analyses"] for group in by_source} == {"a": 2, "b": 1}
+
+    with pytest.raises(ValueError):
+        store.summary(group_by="label")
+
+
+def test_same_text_source_and_version_is_stored_once(store):
+    assert store.save("same", _results(0.6, 0.3, 0.1), "v1", "outlet") is not None
+    assert store.save("same", _results(0.6, 0.3, 0.1), "v1", "outlet") is None
+
+    # A different source or model version is a separate analysis
+    assert store.save("same", _results(0.6, 0.3, 0.1), "v1", "other") is not None
+    assert store.save("same", _results(0.6, 0.3, 0.1), "v2", "outlet") is not None
+
+    assert store.summary(source="outlet", model_version="v1")[0]["analyses"] == 1
+    assert sum(group["analyses"] for group in store.summary(group_by="model_version")) == 3
+
+
+def test_query_filters_and_pages(store):
+    for day in range(1, 6):
+        store.save(f"text {day}", _results(0.6, 0.3, 0.1), "v1", "outlet",
+                   metadata={"n": day}, published_at=f"2024-03-0{day}")
+
+    rows = store.query(source="outlet", limit=2, offset=1)
+    assert [row["metadata"]["n"] for row in rows] == [4, 3]
+    assert rows[0]["results"]["sentiment"]["top"]["label"] == "joy"
+
+    [row] = store.query(text_hash=text_hash("text 2"))
+    assert row["day"] == "2024-03-02"
+
+
+def test_invalid_published_at_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.save("text", _results(0.6, 0.3, 0.1), "v1", published_at="last tuesday")
+    with pytest.raises(ValueError):
+        parse_timestamp(20240301)
@@ -0,0 +1,91 @@
+"""
+Tests for priority and per-client fairness in `scheduler`.
+"""
+
+import asyncio
+
+import pytest
+
+import scheduler
+from scheduler import BULK, INTERACTIVE, InferenceScheduler, client_identity, resolve_priority
+
+
+def _run_in_order(submissions):
+    """
+    Queue (name, priority, client) jobs before starting a single worker,
+    and return the names in the order they were executed.
+    """
+    executed = []
+
+    async def scenario():
+        jobs = InferenceScheduler(workers=1)
+        tasks = [
+            asyncio.ensure_future(jobs.run(executed.append, name, priority=priority, client=client))
+            for name, priority, client in submissions
+        ]
+        # Let every task enqueue its job before any job runs
+        await asyncio.sleep(0)
+        jobs.start()
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            jobs.stop()
+
+    asyncio.run(scenario())
+    return executed
+
+
+def test_interactive_runs_before_bulk():
+    order = _run_in_order([
+        ("bulk-1", BULK, "nightly"),
+        ("bulk-2", BULK, "nightly"),
+        ("interactive-1", INTERACTIVE, "dashboard"),
+    ])
+    assert order == ["interactive-1", "bulk-1", "bulk-2"]
+
+
+def test_clients_are_served_round_robin_within_a_class():
+    order = _run_in_order([
+        ("a1", INTERACTIVE, "a"),
+        ("a2", INTERACTIVE, "a"),
+        ("a3", INTERACTIVE, "a"),
+        ("b1", INTERACTIVE, "b"),
+        ("c1", INTERACTIVE, "c"),
+        ("b2", INTERACTIVE, "b"),
+    ])
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_job_result_and_exception_are_returned_to_caller():
+    async def scenario():
+        jobs = InferenceScheduler(workers=1)
+        jobs.start()
+        try:
+            assert await jobs.run(sum, [1, 2, 3]) == 6
+            with pytest.raises(ZeroDivisionError):
+                await jobs.run(lambda: 1 / 0)
+            with pytest.raises(ValueError):
+                await jobs.run(sum, [], priority="urgent")
+        finally:
+            jobs.stop()
+
+    asyncio.run(scenario())
+
+
+def test_resolve_priority_respects_pinned_keys(monkeypatch):
+    monkeypatch.setattr(scheduler, "API_KEY_PRIORITIES", {"nightly": BULK, "dashboard": INTERACTIVE})
+
+    assert resolve_priority() == INTERACTIVE
+    assert resolve_priority(BULK) == BULK
+    assert resolve_priority(INTERACTIVE, "nightly") == BULK
+    assert resolve_priority(BULK, "dashboard") == BULK
+    assert resolve_priority(None, "dashboard") == INTERACTIVE
+
+
+def test_only_configured_keys_identify_a_client(monkeypatch):
+    monkeypatch.setattr(scheduler, "API_KEY_PRIORITIES", {"dashboard": INTERACTIVE})
+
+    assert client_identity("dashboard", "10.0.0.1") == "key:dashboard"
+    # Made-up keys from one address share that address's turn
+    assert client_identity("random-1", "10.0.0.2") == client_identity("random-2", "10.0.0.2")
+    assert client_identity(None, None) == "addr:anonymous"
@@ -0,0 +1,215 @@
+"""
+thread_budget.py
+----------------
+CPU thread budgeting for the Bias Checker models.
+
+Torch, the Hugging Face tokenizers and Detoxify each default to using
+every core. With several models (or several uvicorn workers) running
+at once this oversubscribes the CPU and throughput drops. This module
+applies an explicit budget instead:
+
+- Per worker: intra-op / inter-op thread counts and optional core
+  affinity, so N workers split the machine instead of fighting over it
+- Per model: the intra-op thread count used while that model runs
+
+The budget is read from a JSON file named by ``BIAS_CHECKER_THREAD_CONFIG``.
+Without it, nothing is changed. ``thread_sweep.py`` measures this machine
+and writes a recommended file.
+
+Config Format::
+
+    {
+        "workers": 2,
+        "worker": {"intra_op": 4, "inter_op": 1, "affinity": "auto"},
+        "models": {
+            "emotion": {"intra_op": 2},
+            "political": {"intra_op": 4},
+            "toxicity": {"intra_op": 2},
+            "flan": {"intra_op": 4}
+        }
+    }
+
+``affinity`` is ``"auto"`` (split the available cores evenly between
+``workers``), an explicit list of core lists (one per worker), or omitted.
+Pinning needs ``os.sched_setaffinity`` (Linux); elsewhere it is skipped
+and only the thread counts apply.
+
+Affinity is per worker only. Torch's intra-op pool is created once per
+process and keeps the affinity it started with, so re-pinning around a
+single model call would not move the threads doing its work.
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+import threading
+
+import torch
+
+# Environment variable naming the JSON thread budget file
+THREAD_CONFIG_ENV = "BIAS_CHECKER_THREAD_CONFIG"
+
+_config = None
+_worker_slot = None
+_slot_lock_file = None
+_threads_lock = threading.RLock()
+
+
+def load_thread_config(path: str = None):
+    """
+    Read the thread budget file.
+
+    Args:
+        path (str, optional): JSON file. Defaults to the
+            ``BIAS_CHECKER_THREAD_CONFIG`` environment variable.
+
+    Returns:
+        dict or None: Parsed config, or None if no budget is configured.
+    """
+    path = path or os.environ.get(THREAD_CONFIG_ENV)
+    if not path:
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _claim_worker_slot(workers: int):
+    """
+    Claim a worker index in [0, workers) shared by all local processes.
+
+    Each slot is an exclusive lock on a temp file that is held for the
+    lifetime of the process, so sibling uvicorn workers get distinct
+    slots without any coordination. Falls back to pid-based assignment
+    if every slot is taken or file locking is unavailable (Windows).
+    """
+    global _slot_lock_file
+
+    try:
+        import fcntl
+    except ImportError:
+        return os.getpid() % workers
+
+    for slot in range(workers):
+        path = os.path.join(tempfile.gettempdir(), f"bias-checker-worker-{slot}.lock")
+        handle = open(path, "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _slot_lock_file = handle
+        return slot
+
+    return os.getpid() % workers
+
+
+def _worker_cores(affinity, workers: int, slot: int):
+    """
+    Cores this worker should be pinned to, or None for no pinning.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+
+    if affinity == "auto":
+        available = sorted(os.sched_getaffinity(0))
+        per_worker = max(1, len(available) // workers)
+        start = (slot * per_worker) % len(available)
+        return available[start:start + per_worker]
+
+    if isinstance(affinity, list) and affinity:
+        return affinity[slot % len(affinity)]
+
+    return None
+
+
+def apply_worker_budget(config: dict = None):
+    """
+    Apply the per-worker part of the thread budget to this process.
+
+    Must be called before models are loaded/used (tokenizer thread
+    pools and torch inter-op threads are fixed on first use).
+
+    Args:
+        config (dict, optional): Thread budget. Defaults to the file from
+            ``BIAS_CHECKER_THREAD_CONFIG``.
+
+    Returns:
+        dict or None: Summary of the applied settings, or None if no
+        budget is configured.
+    """
+    global _config, _worker_slot
+
+    config = config if config is not None else load_thread_config()
+    _config = config
+    if not config:
+        return None
+
+    workers = max(1, int(config.get("workers", 1)))
+    worker = config.get("worker", {})
+
+    if _worker_slot is None:
+        _worker_slot = _claim_worker_slot(workers)
+
+    cores = _worker_cores(worker.get("affinity"), workers, _worker_slot)
+    if cores:
+        os.sched_setaffinity(0, cores)
+
+    intra_op = worker.get("intra_op") or (len(cores) if cores else None)
+    inter_op = worker.get("inter_op")
+
+    if intra_op:
+        torch.set_num_threads(int(intra_op))
+        # Tokenizers (Rust/rayon) and OpenMP pick these up on first use
+        os.environ["RAYON_NUM_THREADS"] = str(intra_op)
+        os.environ["OMP_NUM_THREADS"] = str(intra_op)
+        os.environ["MKL_NUM_THREADS"] = str(intra_op)
+
+    if inter_op:
+        try:
+            torch.set_interop_threads(int(inter_op))
+        except RuntimeError as e:
+            # Only allowed once, before any inter-op parallel work
+            print(f"Could not set inter-op threads: {e}")
+
+    applied = {
+        "slot": _worker_slot,
+        "workers": workers,
+        "cores": cores,
+        "intra_op": torch.get_num_threads(),
+        "inter_op": torch.get_num_interop_threads(),
+    }
+    print(f" ==== Thread budget applied: {applied} ==== \n")
+    return applied
+
+
+@contextmanager
+def model_threads(model: str):
+    """
+    Run a block with the intra-op thread count budgeted for `model`.
+
+    Torch's thread count is process-wide, so the switch is guarded by a
+    lock and restored afterwards; budgeted models therefore run one at a
+    time within a worker. Without a per-model budget this is a no-op.
+
+    Args:
+        model (str): Model key ("emotion", "political", "toxicity", "flan", ...).
+    """
+    budget = (_config or {}).get("models", {}).get(model, {})
+    threads = budget.get("intra_op")
+
+    if not threads:
+        yield
+        return
+
+    with _threads_lock:
+        previous = torch.get_num_threads()
+        torch.set_num_threads(int(threads))
+        try:
+            yield
+        finally:
+            torch.set_num_threads(previous)
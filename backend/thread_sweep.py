@@ -0,0 +1,422 @@
+"""
+thread_sweep.py
+---------------
+Measure model throughput across CPU thread settings on this machine
+and recommend a thread budget (see `thread_budget.py`).
+
+The sweep runs in two phases, each in fresh worker processes:
+
+1. One process loads the models, records how much memory they take,
+   and times each model at several intra-op thread counts. This picks
+   the per-model thread counts for every candidate core share.
+2. Each candidate layout (N workers with cores/N threads each) is run
+   as N concurrent processes under `thread_budget.apply_worker_budget`,
+   and their combined full-analysis throughput is measured, so CPU,
+   cache and memory-bandwidth contention show up in the numbers.
+
+Worker counts whose models would not fit in the available RAM are not
+tried. The fastest measured layout is written as a
+``BIAS_CHECKER_THREAD_CONFIG`` file.
+
+Intended Usage:
+    $ python thread_sweep.py --output thread_config.json
+    $ python thread_sweep.py --models emotion toxicity --iterations 20
+    $ BIAS_CHECKER_THREAD_CONFIG=thread_config.json uvicorn main:app --workers 2
+
+Author(s):
+- Backend & API Integration: Dominik T., Amara B.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import torch
+
+import run_analysis
+from thread_budget import THREAD_CONFIG_ENV, model_threads
+
+# Fraction of the best throughput a smaller thread count must reach to be preferred
+EFFICIENCY_TOLERANCE = 0.9
+
+# Share of the available RAM that all workers' models may use together
+MEMORY_HEADROOM = 0.85
+
+SAMPLE_TEXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_text.txt")
+
+
+def _sample_text(words: int):
+    """
+    First `words` words of ``test_text.txt`` as a representative input.
+    """
+    with open(SAMPLE_TEXT_PATH, "r", encoding="utf-8") as f:
+        return " ".join(f.read().split()[:words])
+
+
+def _model_runners(text: str):
+    """
+    Callables running one inference per model on `text`.
+    """
+    return {
+        "emotion": lambda: run_analysis.emotion_classifier(text, truncation=True),
+        "political": lambda: run_analysis.larger_political_model(text, truncation=True),
+        "toxicity": lambda: run_analysis.toxicity_model.predict(text),
+        "flan": lambda: run_analysis.summarizer(text),
+    }
+
+
+def _thread_candidates(max_threads: int):
+    """
+    Powers of two up to `max_threads`, plus `max_threads` itself.
+    """
+    candidates = []
+    threads = 1
+    while threads < max_threads:
+        candidates.append(threads)
+        threads *= 2
+    candidates.append(max_threads)
+    return candidates
+
+
+def measure(models: list, thread_counts: list, iterations: int, text: str):
+    """
+    Time each model at each thread count.
+
+    Args:
+        models (list[str]): Model keys to measure.
+        thread_counts (list[int]): Intra-op thread counts to try.
+        iterations (int): Timed inferences per setting (after one warm-up).
+        text (str): Input text.
+
+    Returns:
+        dict: model → {threads: inferences per second}.
+    """
+    runners = _model_runners(text)
+    results = {}
+
+    for model in models:
+        results[model] = {}
+        for threads in thread_counts:
+            torch.set_num_threads(threads)
+            runners[model]()        # warm-up
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                runners[model]()
+            elapsed = time.perf_counter() - start
+
+            throughput = iterations / elapsed
+            results[model][threads] = throughput
+            print(f"  {model:<10} threads={threads:<3} {throughput:8.2f} inferences/s")
+
+    return results
+
+
+def _best_threads(measurements: dict, max_threads: int):
+    """
+    Smallest thread count (≤ `max_threads`) within tolerance of the best.
+
+    Returns:
+        tuple[int, float]: (threads, inferences per second)
+    """
+    allowed = {t: thr for t, thr in measurements.items() if t <= max_threads}
+    if not allowed:
+        threads = min(measurements)
+        return threads, measurements[threads]
+
+    best = max(allowed.values())
+    for threads in sorted(allowed):
+        if allowed[threads] >= EFFICIENCY_TOLERANCE * best:
+            return threads, allowed[threads]
+
+
+def _rss_bytes():
+    """
+    Resident memory of this process, or None if it cannot be read.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _available_memory():
+    """
+    RAM available for new processes, or None if it cannot be read.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _sweep_worker(models: list, thread_counts: list, iterations: int, text: str, queue):
+    """
+    Phase 1 process: load models, record their memory and time each model.
+    """
+    try:
+        before = _rss_bytes()
+        run_analysis.load_models()
+        after = _rss_bytes()
+        model_memory = after - before if before is not None and after is not None else None
+
+        results = measure(models, thread_counts, iterations, text)
+        queue.put(("ok", {"results": results, "model_memory": model_memory}))
+    except Exception as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def _layout_worker(config_path: str, models: list, iterations: int, text: str, barrier, queue):
+    """
+    Phase 2 process: load models under a thread budget, wait for all
+    siblings, then run `iterations` full analyses and report the span.
+    """
+    try:
+        os.environ[THREAD_CONFIG_ENV] = config_path
+        run_analysis.load_models()      # applies the worker budget first
+        runners = _model_runners(text)
+
+        for model in models:            # warm-up
+            with model_threads(model):
+                runners[model]()
+
+        barrier.wait()
+        start = time.time()
+        for _ in range(iterations):
+            for model in models:
+                with model_threads(model):
+                    runners[model]()
+        queue.put(("ok", (start, time.time())))
+    except Exception as e:
+        barrier.abort()
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def _run_processes(context, target, args_list: list, queue):
+    """
+    Start one process per argument tuple and collect their queue replies.
+
+    Raises:
+        RuntimeError: If any process reported an error or died (e.g.
+            killed for running out of memory).
+    """
+    import queue as queue_module
+
+    processes = [context.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+
+    replies = []
+    while len(replies) < len(processes):
+        try:
+            status, value = queue.get(timeout=5)
+        except queue_module.Empty:
+            dead = [p for p in processes if p.exitcode not in (None, 0)]
+            if not dead:
+                continue
+            status, value = "error", f"process exited with code {dead[0].exitcode}"
+
+        if status != "ok":
+            for process in processes:
+                process.terminate()
+            raise RuntimeError(f"Sweep worker failed: {value}")
+        replies.append(value)
+
+    for process in processes:
+        process.join()
+    return replies
+
+
+def sweep_models(models: list, thread_counts: list, iterations: int, text: str):
+    """
+    Phase 1: per-model thread measurements and per-worker model memory.
+
+    Runs in a separate process so the coordinating process never holds
+    a copy of the models while layouts are measured.
+
+    Returns:
+        tuple[dict, int or None]: (`measure` results, bytes of memory
+        the loaded models take in one worker)
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    [reply] = _run_processes(
+        context, _sweep_worker, [(models, thread_counts, iterations, text, queue)], queue
+    )
+    return reply["results"], reply["model_memory"]
+
+
+def layout_config(results: dict, cores: int, workers: int):
+    """
+    Thread budget for `workers` workers sharing `cores` cores.
+
+    Each worker gets an equal share of the cores; each model uses the
+    fewest threads within that share that reach near-best throughput.
+    """
+    per_worker = max(1, cores // workers)
+    return {
+        "workers": workers,
+        "worker": {"intra_op": per_worker, "inter_op": 1, "affinity": "auto"},
+        "models": {
+            model: {"intra_op": _best_threads(measurements, per_worker)[0]}
+            for model, measurements in results.items()
+        },
+    }
+
+
+def measure_layout(config: dict, models: list, iterations: int, text: str):
+    """
+    Run `config` as concurrent worker processes and measure throughput.
+
+    Returns:
+        float: Full analyses per second across all workers (from the
+        first worker's start to the last worker's finish).
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    barrier = context.Barrier(config["workers"])
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+        config_path = f.name
+
+    try:
+        spans = _run_processes(
+            context, _layout_worker,
+            [(config_path, models, iterations, text, barrier, queue)] * config["workers"],
+            queue,
+        )
+    finally:
+        os.remove(config_path)
+
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    return config["workers"] * iterations / elapsed
+
+
+def max_workers_for_memory(model_memory: int):
+    """
+    How many workers' models fit in the available RAM (None if unknown).
+    """
+    available = _available_memory()
+    if not model_memory or available is None:
+        return None
+    return int(available * MEMORY_HEADROOM // model_memory)
+
+
+def recommend(results: dict, cores: int, models: list, iterations: int, text: str,
+              max_workers: int = None, workers: int = None):
+    """
+    Measure candidate layouts and pick the fastest.
+
+    Unless `workers` is fixed, every power-of-two worker count up to the
+    core count (and at most `max_workers`) is run concurrently for real.
+
+    Args:
+        results (dict): Output of `measure` (per-model thread curves).
+        cores (int): Cores available to the server.
+        models (list[str]): Models in one full analysis.
+        iterations (int): Full analyses per worker per layout.
+        text (str): Input text.
+        max_workers (int, optional): Memory limit on the worker count.
+        workers (int, optional): Fix the number of workers.
+
+    Returns:
+        tuple[dict, float]: (thread budget config, measured full analyses
+        per second across all workers)
+    """
+    if workers:
+        worker_options = [workers]
+    else:
+        worker_options = [n for n in _thread_candidates(cores) if max_workers is None or n <= max_workers]
+        if not worker_options:
+            print("  warning: models need more memory than is available; measuring 1 worker only")
+            worker_options = [1]
+
+    best_config, best_throughput = None, 0.0
+    for option in worker_options:
+        config = layout_config(results, cores, option)
+        throughput = measure_layout(config, models, iterations, text)
+        print(f"  workers={option:<3} threads/worker={config['worker']['intra_op']:<3} "
+              f"{throughput:.2f} analyses/s (measured)")
+
+        if throughput > best_throughput:
+            best_config, best_throughput = config, throughput
+
+    return best_config, best_throughput
+
+
+# ==============================================
+#  MAIN EXECUTION LOGIC
+# ==============================================
+def main():
+    """
+    Command-line entry point for the thread sweep.
+    """
+    parser = argparse.ArgumentParser(description="Sweep CPU thread settings and recommend a budget.")
+    parser.add_argument("--models", nargs="+", default=["emotion", "political", "toxicity", "flan"],
+                        choices=["emotion", "political", "toxicity", "flan"])
+    parser.add_argument("--iterations", type=int, default=10, help="Timed inferences per setting.")
+    parser.add_argument("--layout-iterations", type=int, default=5,
+                        help="Full analyses per worker when measuring a layout.")
+    parser.add_argument("--words", type=int, default=200, help="Words of sample text per inference.")
+    parser.add_argument("--workers", type=int, help="Fix the number of workers instead of searching.")
+    parser.add_argument("--output", default="thread_config.json", help="Where to write the budget.")
+    args = parser.parse_args()
+
+    # Measure with unconstrained defaults, not a previously applied budget
+    os.environ.pop(THREAD_CONFIG_ENV, None)
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"\n ==== Sweeping thread settings on {cores} cores ==== \n")
+
+    text = _sample_text(args.words)
+    results, model_memory = sweep_models(args.models, _thread_candidates(cores), args.iterations, text)
+
+    max_workers = max_workers_for_memory(model_memory)
+    if max_workers is None:
+        print("\n  warning: could not measure memory; worker count is not capped by RAM")
+    else:
+        print(f"\n  models use ~{model_memory / 2**30:.1f} GiB per worker; "
+              f"at most {max_workers} workers fit in available RAM")
+
+    print("\n ==== Worker layouts (concurrent processes) ==== \n")
+    config, throughput = recommend(
+        results, cores, args.models, args.layout_iterations, text, max_workers, args.workers
+    )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    print(f"\nRecommended layout ({throughput:.2f} analyses/s measured):")
+    print(json.dumps(config, indent=2))
+    print(f"\nWritten to {args.output}. Run with:")
+    print(f"  BIAS_CHECKER_THREAD_CONFIG={args.output} uvicorn main:app --workers {config['workers']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())